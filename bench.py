@@ -0,0 +1,150 @@
+"""
+Defter hattı için sentetik veri kıyaslaması.
+
+    python bench.py                                   # varsayılan boyutlar, JSON stdout'a
+    python bench.py --boyutlar 50000,500000 --cikti sonuc.json
+    python bench.py --karsilastir taban.json          # tabana göre yavaşlayanları işaretler
+
+Sheets bağlantısı bellekte taklit edilir; ağ ve Streamlit gerekmez.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import numpy as np
+import pandas as pd
+from butce import analiz
+from butce.analiz import etiketleri_analiz_et
+from butce.arama import AramaIndeksi
+from butce.depo import SheetsDepo, filtrele, satirlari_hazirla
+from butce.ozet import aylik_ozet, ozet_kpi
+from butce.rapor import raporlar
+from butce.tarih import son_odeme_hesapla, tarih_olustur
+from butce.tekrar import sabit_giderleri_kopyala
+
+KATEGORILER = [("Maaş", "Gelir", 1), ("Kira Geliri", "Gelir", 5), ("Market", "Gider", 0), ("Kira", "Gider", 1), ("Fatura", "Gider", 20),
+               ("Ulaşım", "Gider", 0), ("Eğlence", "Gider", 0), ("Sağlık", "Gider", 0), ("Eğitim", "Gider", 15), ("Kredi Kartı", "Gider", 28)]
+ETIKETLER = ["#tatil", "#ev", "#gıda", "#iş", "#çocuk", "#araba", "#hediye", "#sağlık", "#bayram", "#okul"]
+KELIMELER = ["süt", "ekmek", "elektrik", "doğalgaz", "benzin", "sinema", "kira", "ödeme", "ilaç", "kitap", "taksi", "su"]
+DURUMLAR = np.array(["TRUE", "FALSE", "1.0", "0.0", "1", "0", ""], dtype=object)
+
+# --- SAHTE BAĞLANTI ---
+class BellekBaglantisi:
+    """GSheetsConnection'ın read/update/create kısmı; sayfalar bellekte DataFrame olarak durur."""
+    def __init__(self, sayfalar=None): self.sayfalar = dict(sayfalar or {})
+
+    def read(self, worksheet, ttl=0):
+        if worksheet not in self.sayfalar: raise KeyError(worksheet)
+        return self.sayfalar[worksheet].copy()
+
+    def update(self, worksheet, data):
+        if worksheet not in self.sayfalar: raise KeyError(worksheet)
+        self.sayfalar[worksheet] = data.copy()
+
+    def create(self, worksheet, data): self.sayfalar[worksheet] = data.copy()
+
+# --- ÜRETEÇ ---
+def defter_uret(n, tohum=42, yil_sayisi=6, son_yil=2026):
+    """Sayfadan okunmuş gibi ham (metin) defter: birkaç yıl, Türkçe kategoriler, etiketli açıklamalar, karışık Durum."""
+    rng = np.random.default_rng(tohum)
+    kat = rng.choice(len(KATEGORILER), n, p=[.08, .02, .3, .06, .12, .14, .1, .06, .04, .08])
+    ilk = np.datetime64(f"{son_yil - yil_sayisi + 1}-01-01")
+    tarih = ilk + rng.integers(0, 365 * yil_sayisi, n).astype("timedelta64[D]")
+    gelir = np.array([KATEGORILER[k][1] == "Gelir" for k in kat])
+    tutar = np.where(gelir, rng.normal(25000, 6000, n), rng.lognormal(6, 1.1, n)).round(2).clip(1)
+    kelime = np.array(KELIMELER, dtype=object)[rng.integers(0, len(KELIMELER), n)]
+    etiket_sayisi = rng.choice(3, n, p=[.4, .45, .15])
+    etiket = np.array(ETIKETLER, dtype=object)
+    aciklama = [k if e == 0 else k + " " + " ".join(etiket[rng.integers(0, len(etiket), e)]) for k, e in zip(kelime, etiket_sayisi)]
+    tarih_metin = pd.Series(tarih).dt.strftime("%Y-%m-%d")
+    return pd.DataFrame({
+        "Tarih": tarih_metin, "Kategori": [KATEGORILER[k][0] for k in kat], "Tür": np.where(gelir, "Gelir", "Gider"),
+        "Tutar": tutar, "Son Ödeme Tarihi": tarih_metin.where(rng.random(n) < .7, ""), "Açıklama": aciklama,
+        "Durum": DURUMLAR[rng.integers(0, len(DURUMLAR), n)],
+        "ID": ["r" + format(i, "011x") for i in range(n)],
+    })
+
+def kategori_tablosu(): return pd.DataFrame(KATEGORILER, columns=["Kategori", "Tur", "VarsayilanGun"])
+
+# --- ÖLÇÜM ---
+def olc(islem, tekrar, hazirla=None):
+    """islem'i tekrar kez çalıştırır, en iyi süreyi (saniye) döner. hazirla her turdan önce ölçüm dışında çağrılır."""
+    en_iyi = float("inf")
+    for _ in range(tekrar):
+        if hazirla: hazirla()
+        bas = time.perf_counter()
+        islem()
+        en_iyi = min(en_iyi, time.perf_counter() - bas)
+    return en_iyi
+
+def senaryolar(n, tohum):
+    ham = defter_uret(n, tohum)
+    depo = SheetsDepo(BellekBaglantisi({"Veriler": ham}))
+    df = depo.read_ledger()
+    yil = int(df["Tarih"].dt.year.max())
+    ay = filtrele(df, yil, 3)
+    indeks = AramaIndeksi(df)
+    return {
+        "normalize": (lambda: depo.read_ledger(), None),
+        "filtre_yil_ay": (lambda: filtrele(df, yil, 3), None),
+        "arama_indeks": (lambda: AramaIndeksi(df), None),
+        "arama_sorgu": (lambda: indeks.ara("market #gıda tutar>100"), None),
+        "etiket_analizi": (lambda: etiketleri_analiz_et(df[df["Tür"] == "Gider"]), analiz._etiket_onbellegi.clear),
+        "kpi": (lambda: ozet_kpi(aylik_ozet(df)), None),
+        "gecen_ayi_kopyala": (lambda: sabit_giderleri_kopyala(ay, kategori_tablosu(), yil, 4, 3, filtrele(df, yil, 4)), None),
+        "kayit_serilestirme": (lambda: satirlari_hazirla(df), None),
+        "rapor": (lambda: raporlar(aylik_ozet(df)), None),
+        "form_tarihleri_1000": (lambda: [son_odeme_hesapla(tarih_olustur(yil, "Ocak", g % 31), g % 29) for g in range(1000)], None),
+    }
+
+def calistir(boyutlar, tekrar=3, tohum=42):
+    sonuc = {"meta": {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+                      "tohum": tohum, "tekrar": tekrar}, "sonuclar": {}}
+    for n in boyutlar:
+        olcumler = {}
+        for ad, (islem, hazirla) in senaryolar(n, tohum).items():
+            olcumler[ad] = round(olc(islem, tekrar, hazirla), 6)
+            print(f"{n:>9,} {ad:<20} {olcumler[ad] * 1000:10.2f} ms", file=sys.stderr)
+        sonuc["sonuclar"][str(n)] = olcumler
+    return sonuc
+
+def karsilastir(sonuc, taban, esik=1.25, taban_ms=1.0):
+    """
+    Tabandakinden esik katından daha yavaş olan ölçümleri döner: [(boyut, ad, taban_s, yeni_s)].
+    taban_ms altındaki çok kısa ölçümler gürültü sayılır ve atlanır.
+    """
+    gerileme = []
+    for n, olcumler in sonuc["sonuclar"].items():
+        for ad, sure in olcumler.items():
+            eski = taban.get("sonuclar", {}).get(n, {}).get(ad)
+            if eski is None or max(eski, sure) * 1000 < taban_ms: continue
+            if sure > eski * esik: gerileme.append((n, ad, eski, sure))
+    return gerileme
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Defter hattı kıyaslaması")
+    p.add_argument("--boyutlar", default="5000,50000", help="virgülle ayrılmış satır sayıları")
+    p.add_argument("--tekrar", type=int, default=3)
+    p.add_argument("--tohum", type=int, default=42)
+    p.add_argument("--cikti", help="JSON sonucun yazılacağı dosya (verilmezse stdout)")
+    p.add_argument("--karsilastir", metavar="TABAN", help="karşılaştırılacak taban JSON")
+    p.add_argument("--esik", type=float, default=1.25, help="gerileme sayılacak yavaşlama oranı")
+    a = p.parse_args(argv)
+
+    sonuc = calistir([int(b) for b in a.boyutlar.split(",")], a.tekrar, a.tohum)
+    metin = json.dumps(sonuc, indent=2, ensure_ascii=False)
+    if a.cikti:
+        with open(a.cikti, "w", encoding="utf-8") as f: f.write(metin + "\n")
+    else: print(metin)
+
+    if a.karsilastir:
+        with open(a.karsilastir, encoding="utf-8") as f: taban = json.load(f)
+        gerileme = karsilastir(sonuc, taban, a.esik)
+        for n, ad, eski, yeni in gerileme:
+            print(f"GERİLEME {int(n):>9,} {ad:<20} {eski * 1000:.2f} ms -> {yeni * 1000:.2f} ms ({yeni / eski:.2f}x)", file=sys.stderr)
+        if gerileme: return 1
+        print("Gerileme yok.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__": sys.exit(main())
@@ -0,0 +1,5 @@
+"""
+Bütçe defterinin Streamlit'ten bağımsız çekirdeği: şema, depolar, önbellek,
+özetler, arama, tekrar eden giderler, piyasa kurları ve raporlar.
+Ağır bağımlılıklar (yfinance, gspread) yalnızca kullanıldıkları yerde yüklenir.
+"""
@@ -0,0 +1,67 @@
+"""
+Web sunucusu açmadan aylık/yıllık rapor üretir (cron işleri için).
+
+    python -m butce rapor --sqlite butce.db --cikti raporlar/
+    python -m butce rapor --csv yedek.csv --bicim json
+    python -m butce ice-aktar --sqlite butce.db ekstre.csv --kural migros=Market
+
+Defter tek geçişte aylık özete indirgenir (SQLite'ta tek GROUP BY sorgusu);
+tüm raporlar bu özetten hesaplanır. ice-aktar banka ekstresini tekrarları
+atarak tek yazmada deftere ekler.
+"""
+import argparse
+import os
+import sys
+from .rapor import csv_ozeti, raporlar
+
+def rapor_yaz(tablolar, klasor, bicim):
+    os.makedirs(klasor, exist_ok=True)
+    yollar = []
+    for ad, tablo in tablolar.items():
+        yol = os.path.join(klasor, f"{ad}.{bicim}")
+        if bicim == "csv": tablo.to_csv(yol, index=False)
+        else: tablo.to_json(yol, orient="records", force_ascii=False, indent=2)
+        yollar.append(yol)
+    return yollar
+
+def ice_aktar(a):
+    from .depo import SqliteDepo, yeni_surum
+    from .ice_aktar import ekstre_oku, kurallari_coz
+    from .sema import birlestir
+    depo = SqliteDepo(a.sqlite)
+    yeni, atlanan = ekstre_oku(a.ekstre, depo.read_categories(), lambda yillar: birlestir(*[depo.read_ledger(y) for y in yillar]),
+                               ek_kurallar=kurallari_coz("\n".join(a.kural)), isaret="arti_gider" if a.kart else "eksi_gider")
+    if not a.kuru and not yeni.empty:
+        depo.append_rows(yeni)
+        # Çalışan uygulamalar önbelleği sürüm değişince tazeler; sürüm değişmezse aktarılan satırları görmezler
+        depo.write_version(yeni_surum())
+    kategorisiz = int(yeni["Kategori"].isna().sum())
+    print(f"{len(yeni)} yeni kayıt{'' if a.kuru else ' eklendi'}, {atlanan} tekrar atlandı" + (f", {kategorisiz} kategorisiz." if kategorisiz else "."))
+    return 0
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python -m butce", description="Bütçe defteri araçları")
+    alt = p.add_subparsers(dest="komut", required=True)
+    r = alt.add_parser("rapor", help="aylık ve yıllık özet raporları")
+    kaynak = r.add_mutually_exclusive_group(required=True)
+    kaynak.add_argument("--sqlite", metavar="YOL", help="SQLite deposu")
+    kaynak.add_argument("--csv", metavar="YOL", help="uygulamadan indirilen yedek CSV")
+    r.add_argument("--cikti", default=".", help="raporların yazılacağı klasör")
+    r.add_argument("--bicim", choices=["csv", "json"], default="csv")
+    i = alt.add_parser("ice-aktar", help="banka / kart ekstresini deftere ekler")
+    i.add_argument("--sqlite", metavar="YOL", required=True, help="SQLite deposu")
+    i.add_argument("ekstre", help="ekstre CSV dosyası")
+    i.add_argument("--kart", action="store_true", help="artı tutarlar gider (kredi kartı ekstresi)")
+    i.add_argument("--kural", action="append", default=[], metavar="ANAHTAR=KATEGORI")
+    i.add_argument("--kuru", action="store_true", help="yazmadan yalnızca sayıları göster")
+    a = p.parse_args(argv)
+
+    if a.komut == "ice-aktar": return ice_aktar(a)
+    if a.sqlite:
+        from .depo import SqliteDepo
+        ozet = SqliteDepo(a.sqlite).aylik_ozet()
+    else: ozet = csv_ozeti(a.csv)
+    for yol in rapor_yaz(raporlar(ozet), a.cikti, a.bicim): print(yol)
+    return 0
+
+if __name__ == "__main__": sys.exit(main())
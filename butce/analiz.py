@@ -0,0 +1,41 @@
+import threading
+import pandas as pd
+
+ETIKET_DESENI = r"#(\w+)"
+ONBELLEK_SINIRI = 200_000
+
+# Açıklama metni -> etiket demeti. Metin değişmedikçe sonraki çalıştırmalarda yeniden ayrıştırılmaz.
+_etiket_onbellegi = {}
+# Oturumlar aynı süreçte paralel çalışır; önbelleğe okuma/yazma bu kilitle, ayrıştırma kilit dışında yapılır
+_onbellek_kilidi = threading.Lock()
+
+def etiketleri_cikar(aciklamalar):
+    """Her satırın küçük harfe çevrilmiş etiketlerini demet olarak döner."""
+    metin = aciklamalar.fillna("").astype(str)
+    benzersiz = metin.unique()
+    # Eşleme yerel sözlükten yapılır: başka bir oturum arada önbelleği boşaltsa da bu çerçevede boşluk kalmaz
+    with _onbellek_kilidi: eslesme = {m: _etiket_onbellegi[m] for m in benzersiz if m in _etiket_onbellegi}
+    yeni = [m for m in benzersiz if m not in eslesme]
+    if yeni:
+        bulunan = pd.Series(yeni, dtype=object).str.lower().str.extractall(ETIKET_DESENI)[0]
+        gruplu = bulunan.groupby(level=0).agg(tuple)
+        for i, m in enumerate(yeni): eslesme[m] = gruplu.get(i, ())
+        with _onbellek_kilidi:
+            # Sınır aşılınca önbellek boşaltılır, yalnızca bu çerçevenin yeni metinleri kalır
+            if len(_etiket_onbellegi) + len(yeni) > ONBELLEK_SINIRI: _etiket_onbellegi.clear()
+            _etiket_onbellegi.update((m, eslesme[m]) for m in yeni)
+    return metin.map(eslesme)
+
+def etiketleri_analiz_et(df):
+    """
+    Etiket başına toplam tutar. Birden çok etiketli satırın tutarı etiketlere
+    eşit bölünür; sonuç büyükten küçüğe sıralıdır.
+    """
+    if df.empty: return pd.DataFrame()
+    etiketler = etiketleri_cikar(df["Açıklama"])
+    adet = etiketler.str.len()
+    dolu = adet > 0
+    if not dolu.any(): return pd.DataFrame()
+    patlak = pd.DataFrame({"Etiket": etiketler[dolu], "Tutar": df.loc[dolu, "Tutar"] / adet[dolu]}).explode("Etiket")
+    patlak["Etiket"] = patlak["Etiket"].astype(str)
+    return patlak.groupby("Etiket")["Tutar"].sum().reset_index().sort_values("Tutar", ascending=False)
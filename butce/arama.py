@@ -0,0 +1,102 @@
+import re
+import numpy as np
+import pandas as pd
+from .analiz import ETIKET_DESENI
+
+METIN_KOLONLARI = ["Kategori", "Tür", "Açıklama", "Tarih", "Son Ödeme Tarihi", "Tutar"]
+TUTAR_DESENI = re.compile(r"^tutar(>=|<=|>|<|:)([\d.,]+)(?:-([\d.,]+))?$")
+
+def tr_kucult(metin):
+    """Türkçe küçük harf: I -> ı, İ -> i (str.lower ikisini de yanlış çevirir)."""
+    if isinstance(metin, str): return metin.replace("I", "ı").replace("İ", "i").lower()
+    return metin.str.replace("I", "ı", regex=False).str.replace("İ", "i", regex=False).str.lower()
+
+def _kodla(seri):
+    """Kolonu benzersiz değerlerine ayırır; döner: (satır kodları, Türkçe küçültülmüş benzersiz metinler). Eksikler "" olur."""
+    kod, benzersiz = pd.factorize(seri, use_na_sentinel=False)
+    if isinstance(benzersiz, pd.DatetimeIndex): metin = pd.Series(benzersiz.strftime("%Y-%m-%d"), dtype=object)
+    else: metin = pd.Series(np.asarray(benzersiz, dtype=object), dtype=object)
+    return kod, tr_kucult(metin.fillna("").astype(str))
+
+def _sayi(metin): return float(metin.replace(",", "."))
+
+class _TersIndeks:
+    """
+    Benzersiz metinlerden çıkarılan anahtarların sıralı listesi.
+    Önek araması iki searchsorted, satırlara dönüş tek bir isin ile yapılır.
+    """
+    def __init__(self, kodlar, anahtarlar):
+        patlak = anahtarlar.explode().dropna()
+        cift = pd.DataFrame({"k": patlak.to_numpy(dtype=object), "m": patlak.index.to_numpy()}).drop_duplicates().sort_values("k", kind="stable")
+        self.kodlar = kodlar
+        self.anahtarlar = cift["k"].to_numpy(dtype=str)
+        self.metinler = cift["m"].to_numpy()
+
+    def onek(self, onek):
+        bas = np.searchsorted(self.anahtarlar, onek, side="left")
+        son = np.searchsorted(self.anahtarlar, onek + "\uffff", side="left")
+        if bas == son: return None
+        return np.isin(self.kodlar, self.metinler[bas:son])
+
+class AramaIndeksi:
+    """
+    Defter için veri sürümü başına bir kez kurulan arama indeksi.
+    Etiketler ve kategori adları benzersiz metinler üzerinden ters indekse
+    alınır; düz terimler her kolonun küçük harfli benzersiz metinlerinde aranır
+    ve kodlarla satırlara yayılır. Sorgu terimleri VE ile bağlanır:
+        market          herhangi bir kolonda geçen metin (kelime ortası, tarih, tutar dahil)
+        #tatil          etiket öneki
+        kategori:fat    kategori adı öneki (kat: da olur)
+        tutar>500  tutar<=100  tutar:100-250  tutar:75
+    """
+    def __init__(self, df):
+        self.df = df
+        self.tutar = df["Tutar"].to_numpy(dtype=float)
+        kat_kod, kat = _kodla(df["Kategori"])
+        acik_kod, acik = _kodla(df["Açıklama"])
+        self.etiketler = _TersIndeks(acik_kod, acik.str.findall(ETIKET_DESENI))
+        self.kategoriler = _TersIndeks(kat_kod, kat.map(lambda k: [k] if k else []))
+        self._kolonlar = {"Kategori": (kat_kod, kat), "Açıklama": (acik_kod, acik)}
+
+    def kolon_metinleri(self):
+        """(satır kodları, küçültülmüş benzersiz metinler) çiftleri; Kategori/Açıklama dışındakiler ilk gerektiğinde kodlanır."""
+        for col in METIN_KOLONLARI:
+            if col not in self._kolonlar: self._kolonlar[col] = _kodla(self.df[col])
+            yield self._kolonlar[col]
+
+    def _metinde(self, terim):
+        # Her kolonda yalnızca benzersiz metinler taranır; bulunanlar kodlarla satırlara yayılır
+        maske = self._bos()
+        for kod, metin in self.kolon_metinleri():
+            bulunan = metin.str.contains(terim, regex=False).to_numpy(dtype=bool)
+            if bulunan.any(): maske |= bulunan[kod]
+        return maske
+
+    def _bos(self): return np.zeros(len(self.df), dtype=bool)
+
+    def _terim(self, terim):
+        if terim.startswith("#") and len(terim) > 1:
+            maske = self.etiketler.onek(terim[1:])
+            return self._bos() if maske is None else maske
+        for on in ("kategori:", "kat:"):
+            if terim.startswith(on):
+                maske = self.kategoriler.onek(terim[len(on):])
+                return self._bos() if maske is None else maske
+        m = TUTAR_DESENI.match(terim)
+        if m:
+            op, a, b = m.group(1), _sayi(m.group(2)), m.group(3)
+            if op == ">": return self.tutar > a
+            if op == "<": return self.tutar < a
+            if op == ">=": return self.tutar >= a
+            if op == "<=": return self.tutar <= a
+            return (self.tutar >= a) & (self.tutar <= _sayi(b)) if b else self.tutar == a
+        # Düz terim: sonuç başka satırlarda kelime başı eşleşmesi olup olmamasına bağlı kalmasın diye hep metin içinde aranır
+        return self._metinde(terim)
+
+    def ara(self, sorgu):
+        """Sorguya uyan satırlar için bool maske döner."""
+        maske = np.ones(len(self.df), dtype=bool)
+        for terim in tr_kucult(sorgu).split():
+            maske &= self._terim(terim)
+            if not maske.any(): break
+        return maske
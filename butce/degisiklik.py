@@ -0,0 +1,46 @@
+import pandas as pd
+from .depo import satirlari_hazirla
+from .sema import KOLONLAR
+
+def bekleyen_var(durum):
+    """data_editor durumunda kaydedilmemiş düzenleme var mı."""
+    return bool(durum) and any(durum.get(k) for k in ("edited_rows", "added_rows", "deleted_rows"))
+
+def _duz(df):
+    # Karşılaştırma sayfaya yazılacak düz biçim üzerinden yapılır; tarih/kategori tip farkları eşitliği bozmaz
+    return satirlari_hazirla(df).set_index("ID")
+
+def farkli_satirlar(a, b):
+    """a'daki satırlardan b'de aynı ID ile birebir bulunmayanların ID'leri."""
+    if a.empty: return []
+    da, db = _duz(a), _duz(b)
+    db = db[~db.index.duplicated()].reindex(da.index)
+    return da.index[(da != db).any(axis=1)].tolist()
+
+def degisiklikleri_cikar(taban, durum):
+    """
+    data_editor durumundan (edited_rows / added_rows / deleted_rows) en küçük değişiklik kümesini çıkarır.
+    taban editöre verilen tablodur; satır konumları ID'lere onun üzerinden çevrilir.
+    Değeri gerçekte değişmeyen düzenlemeler ve tamamen boş eklenen satırlar atlanır.
+    Döner: (güncellenen satırlar, eklenen satırlar, silinen ID'ler, tarihi olmadığı için atlanan satır sayısı)
+    """
+    taban = taban.reset_index(drop=True)
+    durum = durum or {}
+    silinen = taban["ID"].iloc[[int(i) for i in durum.get("deleted_rows", [])]].tolist()
+
+    duzenlenen = {int(i): d for i, d in (durum.get("edited_rows") or {}).items() if int(i) < len(taban)}
+    guncel = taban.iloc[sorted(duzenlenen)].copy()
+    guncel = guncel[~guncel["ID"].isin(silinen)]
+    for i, degerler in duzenlenen.items():
+        for col, deger in degerler.items():
+            if col in guncel.columns and i in guncel.index: guncel.at[i, col] = deger
+    guncel = guncel[guncel["ID"].isin(farkli_satirlar(guncel, taban))]
+    # Tarihi silinen satırlar kaydedilmez; eklenen tarihsizlerle birlikte sayılır
+    tarihi_var = pd.to_datetime(guncel["Tarih"], errors="coerce").notna()
+    tarihi_silinen = int((~tarihi_var).sum()); guncel = guncel[tarihi_var]
+
+    eklenen = pd.DataFrame([r for r in durum.get("added_rows", []) if any(v not in (None, "") for v in r.values())])
+    eklenen = eklenen.reindex(columns=KOLONLAR[:-1])
+    eklenen = eklenen.assign(**{"Tür": eklenen["Tür"].fillna("Gider"), "Durum": eklenen["Durum"].fillna(False), "Tutar": eklenen["Tutar"].fillna(0.0)})
+    tarihli = pd.to_datetime(eklenen["Tarih"], errors="coerce").notna()
+    return guncel, eklenen[tarihli].reset_index(drop=True), silinen, int((~tarihli).sum()) + tarihi_silinen
@@ -0,0 +1,596 @@
+import sqlite3
+from abc import ABC, abstractmethod
+import threading
+import uuid
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from .ozet import OZET_KOLONLARI, aylik_ozet, bos_ozet
+from .sema import KOLONLAR, birlestir, bos_defter, durum_cevir, normalize_et
+
+# --- SABİTLER ---
+VERI_SAYFASI = "Veriler"
+KATEGORI_SAYFASI = "Kategoriler"
+META_SAYFASI = "Meta"
+YIL_SAYFASI = "Yillar"
+YIL_OZETI_SAYFASI = "YilOzeti"
+KATEGORI_KOLONLARI = ["Kategori", "Tur", "VarsayilanGun"]
+
+# --- YARDIMCILAR ---
+def yeni_id(adet=1):
+    # "r" öneki sayfanın kimliği sayıya çevirmesini engeller (örn. "1e50...")
+    return ["r" + uuid.uuid4().hex[:11] for _ in range(adet)]
+
+def yeni_surum():
+    # Veri sürümü sayı değil tekil belirteçtir; yalnızca eşitliğine bakılır, aynı anda yazan iki süreç aynı değeri üretemez
+    return "v" + uuid.uuid4().hex[:12]
+
+def id_ata(df):
+    """Boş kalan ID hücrelerini doldurur. Atama yapıldıysa True döner."""
+    if "ID" not in df.columns: df["ID"] = pd.NA
+    bos = df["ID"].isna() | (df["ID"].astype(str).str.strip() == "")
+    if bos.any(): df.loc[bos, "ID"] = yeni_id(int(bos.sum()))
+    df["ID"] = df["ID"].astype(str)
+    return bool(bos.any())
+
+def _sayfa_yok_mu(hata):
+    # gspread WorksheetNotFound'u adıyla tanınır (gspread yalnızca Sheets deposunda kurulu); bellekteki bağlantılar KeyError verir
+    return type(hata).__name__ == "WorksheetNotFound" or isinstance(hata, KeyError)
+
+def satirlari_hazirla(df):
+    """DataFrame'i sayfaya yazılacak düz metin/sayı biçimine çevirir."""
+    save_df = df.copy()
+    for col in KOLONLAR:
+        if col not in save_df.columns: save_df[col] = ""
+    # Tarih formatlama
+    for col in ["Tarih", "Son Ödeme Tarihi"]:
+        save_df[col] = pd.to_datetime(save_df[col], errors='coerce').dt.strftime('%Y-%m-%d').fillna("")
+    save_df["Tutar"] = pd.to_numeric(save_df["Tutar"], errors='coerce').fillna(0.0)
+    return save_df[KOLONLAR].astype(object).fillna("")
+
+def tarihsiz_satirlar(df):
+    """Tarihi boş ya da okunamayan ham satırlar; normalize_et bunları atar, göçte kaybolmasınlar diye önceden bakılır."""
+    return df[pd.to_datetime(df["Tarih"], errors='coerce').isna()]
+
+def _tarihsiz_hatasi(tarihsiz):
+    # Sayfa okunurken indeks korunur: satır i sayfada i + 2. satırdır
+    satirlar = ", ".join(str(i + 2) for i in tarihsiz.index[:20])
+    if len(tarihsiz) > 20: satirlar += ", ..."
+    return ValueError(f"{len(tarihsiz)} satırın tarihi boş ya da okunamıyor (sayfa satırı: {satirlar}); taşımadan önce düzeltin ya da silin.")
+
+def varsayilan_kategoriler():
+    return pd.DataFrame([{"Kategori": "Maaş", "Tur": "Gelir", "VarsayilanGun": 1}, {"Kategori": "Market", "Tur": "Gider", "VarsayilanGun": 0}])
+
+def filtrele(df, yil=None, ay=None):
+    """Yıl/ay filtresi (ay 1-12). None verilen alan filtrelenmez."""
+    if yil is None: return df
+    df = df[df["Tarih"].dt.year == int(yil)]
+    if ay is not None: df = df[df["Tarih"].dt.month == int(ay)]
+    return df
+
+def yillar(df):
+    return sorted(df["Tarih"].dt.year.dropna().astype(int).unique().tolist(), reverse=True)
+
+def _ay_araligi(yil, ay=None):
+    """Yıl/ay için [başlangıç, bitiş) tarih metinlerini döner; Tarih indeksini kullanan aralık sorguları içindir."""
+    yil = int(yil)
+    if ay is None: return f"{yil:04d}-01-01", f"{yil + 1:04d}-01-01"
+    ay = int(ay)
+    sy, sa = (yil + 1, 1) if ay == 12 else (yil, ay + 1)
+    return f"{yil:04d}-{ay:02d}-01", f"{sy:04d}-{sa:02d}-01"
+
+# --- DEPO ARAYÜZÜ ---
+class Depo(ABC):
+    """
+    Defter depolarının ortak arayüzü; eksik yöntemi olan depo oluşturulurken hata verir.
+    sorgu_destekli olan depolar yıl/ay filtresini ve aylık özeti kendi içinde
+    hesaplar; diğerlerinde bu işler pandas ile yapılır. yil_parcali olanlar
+    bir yılı tek parça olarak okur, ay filtresi bellekte uygulanır.
+    """
+    sorgu_destekli = False
+    yil_parcali = False
+
+    @abstractmethod
+    def read_ledger(self, yil=None, ay=None): ...
+    @abstractmethod
+    def read_categories(self): ...
+    @abstractmethod
+    def write_categories(self, df): ...
+    @abstractmethod
+    def append_rows(self, df): ...
+    @abstractmethod
+    def update_rows(self, df): ...
+    @abstractmethod
+    def delete_rows(self, ids): ...
+    @abstractmethod
+    def rewrite(self, df): ...
+    @abstractmethod
+    def read_version(self): ...
+    @abstractmethod
+    def write_version(self, surum): ...
+
+    def years(self): return yillar(self.read_ledger())
+    def aylik_ozet(self): return aylik_ozet(self.read_ledger())
+
+    def read_rows(self, ids):
+        df = self.read_ledger()
+        return df[df["ID"].isin(set(map(str, ids)))]
+
+class SheetsDepo(Depo):
+    """
+    Google Sheets deposu.
+    append_rows / update_rows / delete_rows yalnızca değişen satırları gönderir;
+    rewrite tüm sayfayı yeniden yazar ve sadece şema göçleri için kullanılır.
+    """
+    def __init__(self, conn, sayfa=VERI_SAYFASI):
+        self.conn = conn
+        self.sayfa = sayfa
+        self.bellek_raporu = {}
+        self._baslik_var = None
+
+    def read_version(self):
+        """Meta sayfasındaki veri sürümünü okur; sayfa ya da değer yoksa "0". Diğer okuma hataları (kota, ağ) yükselir."""
+        try: df = self.conn.read(worksheet=META_SAYFASI, ttl=0)
+        except Exception as e:
+            if _sayfa_yok_mu(e): return "0"
+            raise
+        if df.empty or "Surum" not in df.columns: return "0"
+        return str(df["Surum"].iloc[0])
+
+    def write_version(self, surum):
+        veri = pd.DataFrame({"Surum": [str(surum)]})
+        try: self.conn.update(worksheet=META_SAYFASI, data=veri)
+        except Exception: self.conn.create(worksheet=META_SAYFASI, data=veri)
+        return str(surum)
+
+    def _calisma_sayfasi(self):
+        # Satır bazlı işlemler gspread Worksheet ister; herkese açık bağlantıda yoktur
+        client = getattr(self.conn, "client", None)
+        if client is None or not hasattr(client, "_select_worksheet"): return None
+        return client._select_worksheet(worksheet=self.sayfa)
+
+    def read_ledger(self, yil=None, ay=None):
+        df = self.conn.read(worksheet=self.sayfa, ttl=0)
+        self._baslik_var = not (df.empty or "Tarih" not in df.columns)
+        if not self._baslik_var: return bos_defter()
+        # İndeks korunur: satır i sayfada i + 2. satırdır (1. satır başlık)
+        sayfa_kolonlari = list(df.columns)
+        df = df.dropna(how="all")
+        for col in KOLONLAR:
+            if col not in df.columns: df[col] = pd.NA
+        bos = df["ID"].isna() | (df["ID"].astype(str).str.strip() == "")
+        # Elle eklenmiş ya da ID kolonu olmayan eski satırlar: yalnızca boş ID hücreleri yazılır
+        if id_ata(df): self._idleri_yaz(df, bos, sayfa_kolonlari)
+        return filtrele(normalize_et(df.reset_index(drop=True), self.bellek_raporu), yil, ay)
+
+    def _idleri_yaz(self, df, bos, sayfa_kolonlari):
+        """
+        Yeni atanan ID'leri tek batch_update ile boş hücrelere yazar; sayfanın
+        geri kalanına dokunulmaz, başka oturumların eklediği satırlar ezilmez.
+        Satır bazlı erişim yoksa tüm sayfa yazılır.
+        """
+        ws = self._calisma_sayfasi()
+        if ws is None: self.rewrite(df); return
+        from gspread.utils import rowcol_to_a1
+        baslik = ws.row_values(1) or sayfa_kolonlari
+        sutun = baslik.index("ID") + 1 if "ID" in baslik else len(baslik) + 1
+        istekler = [{"range": rowcol_to_a1(i + 2, sutun), "values": [[v]]} for i, v in df.loc[bos, "ID"].items()]
+        if "ID" not in baslik: istekler.insert(0, {"range": rowcol_to_a1(1, sutun), "values": [["ID"]]})
+        ws.batch_update(istekler, value_input_option="RAW")
+
+    def read_categories(self):
+        varsayilan = varsayilan_kategoriler()
+        df = self.conn.read(worksheet=KATEGORI_SAYFASI, ttl=0)
+        if df.empty: self.write_categories(varsayilan); return varsayilan
+        if "Kategori" not in df.columns: return varsayilan
+        return df.dropna(how="all")
+
+    def write_categories(self, df): self.conn.update(worksheet=KATEGORI_SAYFASI, data=df)
+
+    def _sutunlar(self, ws):
+        """Şema kolonlarının sayfadaki 1 tabanlı sütun numaraları; kolonlar başlıkta herhangi bir sırada olabilir."""
+        baslik = ws.row_values(1)
+        return {k: baslik.index(k) + 1 for k in KOLONLAR if k in baslik}
+
+    def _ham_oku(self):
+        # Geri dönüş yolları için: geçersiz tarihli satırlar da korunur
+        df = self.conn.read(worksheet=self.sayfa, ttl=0).dropna(how="all")
+        for col in KOLONLAR:
+            if col not in df.columns: df[col] = pd.NA
+        return df[KOLONLAR]
+
+    def rewrite(self, df):
+        save_df = satirlari_hazirla(df); id_ata(save_df)
+        self.conn.update(worksheet=self.sayfa, data=save_df)
+        self._baslik_var = True
+
+    def append_rows(self, df):
+        """Yeni satırları sayfanın sonuna ekler. Eklenen satır sayısını döner."""
+        if df.empty: return 0
+        df = df.copy(); id_ata(df)
+        ws = self._calisma_sayfasi()
+        sutun = self._sutunlar(ws) if ws is not None else {}
+        if ws is not None: self._baslik_var = bool(sutun)
+        if ws is None or not self._baslik_var:
+            mevcut = self._ham_oku() if self._baslik_var is not False else pd.DataFrame(columns=KOLONLAR)
+            self.rewrite(pd.concat([mevcut, df], ignore_index=True))
+            return len(df)
+        # Değerler başlıktaki sütunlarına yerleşir; şemada olmayan sütunlar boş kalır
+        satirlar = np.full((len(df), max(sutun.values())), "", dtype=object)
+        satirlar[:, [c - 1 for c in sutun.values()]] = satirlari_hazirla(df)[list(sutun)].to_numpy()
+        ws.append_rows(satirlar.tolist(), value_input_option="USER_ENTERED", table_range="A1")
+        return len(df)
+
+    def update_rows(self, df):
+        """ID kolonuna göre eşleşen satırları yerinde günceller. Güncellenen satır sayısını döner."""
+        if df.empty: return 0
+        ws = self._calisma_sayfasi()
+        if ws is None:
+            mevcut = self._ham_oku().astype(object).set_index("ID")
+            yeni = df.set_index("ID")
+            ortak = yeni.index.intersection(mevcut.index)
+            kolonlar = yeni.columns.intersection(mevcut.columns)
+            mevcut.loc[ortak, kolonlar] = yeni.loc[ortak, kolonlar]
+            self.rewrite(mevcut.reset_index())
+            return len(ortak)
+
+        from gspread.utils import rowcol_to_a1
+        sutun = self._sutunlar(ws)
+        if "ID" not in sutun: return 0
+        satir_no = {k: i + 1 for i, k in enumerate(ws.col_values(sutun["ID"])) if i > 0}
+        degerler = satirlari_hazirla(df)
+        # Yan yana duran şema kolonları tek aralıkta yazılır (sayfa şema sırasındaysa satır başına bir aralık);
+        # şemada olmayan sütunlara dokunulmaz
+        bloklar = []
+        for k, c in sorted(sutun.items(), key=lambda x: x[1]):
+            if bloklar and bloklar[-1][0] + len(bloklar[-1][1]) == c: bloklar[-1][1].append(k)
+            else: bloklar.append((c, [k]))
+        bloklar = [(c, len(kolonlar), degerler[kolonlar].values.tolist()) for c, kolonlar in bloklar]
+        istekler, sayi = [], 0
+        for j, i in enumerate(degerler["ID"].astype(str)):
+            r = satir_no.get(i)
+            if r is None: continue
+            sayi += 1
+            istekler += [{"range": f"{rowcol_to_a1(r, c)}:{rowcol_to_a1(r, c + n - 1)}", "values": [satirlar[j]]} for c, n, satirlar in bloklar]
+        if istekler: ws.batch_update(istekler, value_input_option="USER_ENTERED")
+        return sayi
+
+    def delete_rows(self, ids):
+        """ID'si verilen satırları siler. Silinen satır sayısını döner."""
+        ids = set(map(str, ids))
+        if not ids: return 0
+        ws = self._calisma_sayfasi()
+        if ws is None:
+            mevcut = self._ham_oku()
+            sil = mevcut["ID"].astype(str).isin(ids)
+            self.rewrite(mevcut[~sil])
+            return int(sil.sum())
+
+        sutun = self._sutunlar(ws)
+        if "ID" not in sutun: return 0
+        satirlar = [i + 1 for i, k in enumerate(ws.col_values(sutun["ID"])) if i > 0 and k in ids]
+        # Aşağıdan yukarı, ardışık satırları tek istekte sil; böylece üstteki numaralar kaymaz
+        bloklar = []
+        for r in sorted(satirlar, reverse=True):
+            if bloklar and bloklar[-1][0] == r + 1: bloklar[-1][0] = r
+            else: bloklar.append([r, r])
+        for bas, son in bloklar: ws.delete_rows(bas, son)
+        return len(satirlar)
+
+class YillikSheetsDepo(Depo):
+    """
+    Yıllara bölünmüş Google Sheets deposu: her yıl kendi sayfasında
+    ("Veriler_2025"), mevcut yıllar "Yillar" sayfasındaki küçük listede durur.
+    Seçili yılın sayfası okunur; diğer yıllar yalnızca "Tüm" ya da arama için
+    gerektiğinde yüklenir. Kapanmış (geçmiş) yılların aylık özeti "YilOzeti"
+    sayfasında saklanır, çok yıllı grafikler o yılların satırlarını okumaz.
+    """
+    sorgu_destekli = True
+    yil_parcali = True
+
+    def __init__(self, conn, onek=VERI_SAYFASI):
+        self.conn = conn
+        self.onek = onek
+        self.bellek_raporu = {}
+        self._ana = SheetsDepo(conn)
+        self._parcalar = {}
+        # ID -> yıl; güncelleme/silmede satırın hangi sayfada olduğunu bulmak için (okunan yıllardan dolar)
+        self._id_yil = {}
+
+    def read_version(self): return self._ana.read_version()
+    def write_version(self, surum): return self._ana.write_version(surum)
+    def read_categories(self): return self._ana.read_categories()
+    def write_categories(self, df): return self._ana.write_categories(df)
+
+    def _parca(self, yil):
+        yil = int(yil)
+        if yil not in self._parcalar:
+            self._parcalar[yil] = SheetsDepo(self.conn, f"{self.onek}_{yil}")
+            self._parcalar[yil].bellek_raporu = self.bellek_raporu
+        return self._parcalar[yil]
+
+    def manifest(self):
+        """Yil, Kapali kolonlu yıl listesi (sayfa yoksa boş)."""
+        try: df = self.conn.read(worksheet=YIL_SAYFASI, ttl=0).dropna(how="all")
+        except Exception: return pd.DataFrame({"Yil": pd.Series(dtype=int), "Kapali": pd.Series(dtype=bool)})
+        if df.empty or "Yil" not in df.columns: return pd.DataFrame({"Yil": pd.Series(dtype=int), "Kapali": pd.Series(dtype=bool)})
+        return pd.DataFrame({"Yil": df["Yil"].astype(int), "Kapali": durum_cevir(df.get("Kapali", pd.Series(False, index=df.index)))})
+
+    def _manifest_yaz(self, df):
+        veri = df.sort_values("Yil", ascending=False).astype({"Yil": int, "Kapali": bool})
+        try: self.conn.update(worksheet=YIL_SAYFASI, data=veri)
+        except Exception: self.conn.create(worksheet=YIL_SAYFASI, data=veri)
+
+    def years(self): return sorted(self.manifest()["Yil"].tolist(), reverse=True)
+
+    def _yil_oku(self, yil):
+        df = self._parca(yil).read_ledger()
+        self._id_yil.update(dict.fromkeys(df["ID"].tolist(), int(yil)))
+        return df
+
+    def read_ledger(self, yil=None, ay=None):
+        if yil is not None:
+            if int(yil) not in self.years(): return bos_defter()
+            return filtrele(self._yil_oku(yil), yil, ay)
+        parcalar = [self._yil_oku(y) for y in self.years()]
+        # Yılların kategori listeleri farklıdır; birlestir kolonları yeniden kategorik yapar
+        return birlestir(*parcalar) if parcalar else bos_defter()
+
+    def read_rows(self, ids):
+        ids = set(map(str, ids))
+        # Yeri bilinmeyen bir ID varsa tüm yıllara bakılır
+        yillar_ = {self._id_yil[i] for i in ids if i in self._id_yil} if ids.issubset(self._id_yil) else self.years()
+        parcalar = [df[df["ID"].isin(ids)] for df in (self._yil_oku(y) for y in yillar_)]
+        return birlestir(*parcalar) if parcalar else bos_defter()
+
+    # --- Kapanmış yılların özeti ---
+    def _yil_ozetleri(self):
+        try: df = self.conn.read(worksheet=YIL_OZETI_SAYFASI, ttl=0).dropna(how="all")
+        except Exception: return bos_ozet()
+        if df.empty: return bos_ozet()
+        return df.reindex(columns=OZET_KOLONLARI).astype({"Yil": int, "Ay": int, "Tür": object, "Kategori": object, "Tutar": float, "Adet": int}).assign(Durum=lambda d: durum_cevir(d["Durum"]))
+
+    def _yil_ozetlerini_yaz(self, df):
+        try: self.conn.update(worksheet=YIL_OZETI_SAYFASI, data=df)
+        except Exception: self.conn.create(worksheet=YIL_OZETI_SAYFASI, data=df)
+
+    def _ozeti_tazele(self, yillar_, ozetler=None, manifest=None):
+        """Verilen kapalı yılların özetini satırlarından yeniden hesaplayıp saklar."""
+        ozetler = self._yil_ozetleri() if ozetler is None else ozetler
+        yeni = [aylik_ozet(self._yil_oku(y)) for y in yillar_]
+        ozetler = pd.concat([ozetler[~ozetler["Yil"].isin(yillar_)]] + [o for o in yeni if not o.empty], ignore_index=True)
+        self._yil_ozetlerini_yaz(ozetler)
+        return ozetler
+
+    def aylik_ozet(self):
+        m = self.manifest()
+        bu_yil = datetime.now().year
+        kapanacak = m.loc[(m["Yil"] < bu_yil) & ~m["Kapali"], "Yil"].tolist()
+        ozetler = self._yil_ozetleri()
+        if kapanacak:
+            ozetler = self._ozeti_tazele(kapanacak, ozetler)
+            m.loc[m["Yil"].isin(kapanacak), "Kapali"] = True
+            self._manifest_yaz(m)
+        kapali = m.loc[m["Kapali"], "Yil"].tolist()
+        parcalar = [ozetler[ozetler["Yil"].isin(kapali)]] + [aylik_ozet(self._yil_oku(y)) for y in m.loc[~m["Kapali"], "Yil"]]
+        parcalar = [p for p in parcalar if not p.empty]
+        if not parcalar: return bos_ozet()
+        return pd.concat(parcalar, ignore_index=True).sort_values(OZET_KOLONLARI[:5], ignore_index=True)
+
+    # --- Yazma ---
+    def _yillara_bol(self, df):
+        yil = pd.to_datetime(df["Tarih"], errors='coerce').dt.year
+        return {int(y): df[yil == y] for y in yil.dropna().unique()}
+
+    def _dokunulan_kapali(self, yillar_):
+        # Kapalı bir yıl değiştiyse saklanan özeti tazelenir
+        m = self.manifest()
+        kapali = [y for y in set(yillar_) if y in m.loc[m["Kapali"], "Yil"].tolist()]
+        if kapali: self._ozeti_tazele(kapali)
+
+    def append_rows(self, df):
+        if df.empty: return 0
+        df = df.copy(); id_ata(df)
+        m = self.manifest()
+        yeni_yillar = []
+        for yil, parca in self._yillara_bol(df).items():
+            if yil in m["Yil"].tolist(): self._parca(yil).append_rows(parca)
+            else:
+                # Yeni yılın sayfası bu satırlarla açılır
+                self.conn.create(worksheet=f"{self.onek}_{yil}", data=satirlari_hazirla(parca))
+                yeni_yillar.append(yil)
+            self._id_yil.update(dict.fromkeys(parca["ID"].astype(str).tolist(), yil))
+        if yeni_yillar:
+            self._manifest_yaz(pd.concat([m, pd.DataFrame({"Yil": yeni_yillar, "Kapali": False})], ignore_index=True))
+        self._dokunulan_kapali(self._yillara_bol(df).keys())
+        return len(df)
+
+    def _yerleri(self, ids):
+        ids = [str(i) for i in ids]
+        if not set(ids).issubset(self._id_yil):
+            for y in self.years(): self._yil_oku(y)
+        return {i: self._id_yil.get(i) for i in ids}
+
+    def update_rows(self, df):
+        if df.empty: return 0
+        df = df.copy(); df["ID"] = df["ID"].astype(str)
+        # Tarihi silinen satır hiçbir yıla ait olmaz; taşınıyor sanılıp silinmesin diye atlanır (eski hali kalır)
+        df = df[pd.to_datetime(df["Tarih"], errors='coerce').notna()]
+        if df.empty: return 0
+        eski_yil = pd.Series(self._yerleri(df["ID"]), dtype=object).reindex(df["ID"]).to_numpy()
+        yeni_yil = pd.to_datetime(df["Tarih"], errors='coerce').dt.year.to_numpy()
+        ayni = eski_yil == yeni_yil
+        sayi = 0
+        for yil, parca in self._yillara_bol(df[ayni]).items(): sayi += self._parca(yil).update_rows(parca)
+        # Tarihi başka yıla taşınan satırlar eski sayfadan silinip yenisine eklenir
+        tasinan = df[~ayni & pd.notna(eski_yil)]
+        if not tasinan.empty:
+            self.delete_rows(tasinan["ID"])
+            self.append_rows(tasinan); sayi += len(tasinan)
+        self._dokunulan_kapali([y for y in set(eski_yil) | set(yeni_yil) if pd.notna(y)])
+        return sayi
+
+    def delete_rows(self, ids):
+        yerler = self._yerleri(ids)
+        sayi = 0
+        for yil in {y for y in yerler.values() if y is not None}:
+            sayi += self._parca(yil).delete_rows([i for i, y in yerler.items() if y == yil])
+        for i in yerler: self._id_yil.pop(i, None)
+        self._dokunulan_kapali({y for y in yerler.values() if y is not None})
+        return sayi
+
+    def rewrite(self, df):
+        """Tüm defteri yıllara bölüp yazar (tek seferlik göç için); yıl listesi ve kapalı yıl özetleri yeniden kurulur."""
+        # Tarihsiz satır hiçbir yıl sayfasına düşmez; sessizce kaybolacağına göç durdurulur
+        tarihsiz = tarihsiz_satirlar(df)
+        if not tarihsiz.empty: raise _tarihsiz_hatasi(tarihsiz)
+        df = df.copy(); id_ata(df)
+        bolum = self._yillara_bol(df)
+        for yil, parca in bolum.items():
+            veri = satirlari_hazirla(parca)
+            try: self.conn.update(worksheet=f"{self.onek}_{yil}", data=veri)
+            except Exception: self.conn.create(worksheet=f"{self.onek}_{yil}", data=veri)
+            self._id_yil.update(dict.fromkeys(parca["ID"].tolist(), yil))
+        bu_yil = datetime.now().year
+        m = pd.DataFrame({"Yil": sorted(bolum), "Kapali": [y < bu_yil for y in sorted(bolum)]})
+        ozet = aylik_ozet(normalize_et(df))
+        self._yil_ozetlerini_yaz(ozet[ozet["Yil"].isin(m.loc[m["Kapali"], "Yil"])] if not ozet.empty else bos_ozet())
+        self._manifest_yaz(m)
+
+class SqliteDepo(Depo):
+    """
+    Yerel SQLite deposu. Tarih "YYYY-MM-DD" metni olarak tutulur; yıl/ay
+    filtreleri Tarih indeksi üzerinde aralık sorgusuna, aylık özet tek bir
+    GROUP BY sorgusuna dönüşür.
+    """
+    sorgu_destekli = True
+
+    def __init__(self, yol):
+        self.yol = yol
+        self.bellek_raporu = {}
+        self._kilit = threading.Lock()
+        self._db = sqlite3.connect(yol, check_same_thread=False)
+        with self._db:
+            self._db.executescript('''
+                CREATE TABLE IF NOT EXISTS veriler (
+                    "ID" TEXT PRIMARY KEY, "Tarih" TEXT NOT NULL, "Kategori" TEXT, "Tür" TEXT,
+                    "Tutar" REAL, "Son Ödeme Tarihi" TEXT, "Açıklama" TEXT, "Durum" INTEGER);
+                CREATE INDEX IF NOT EXISTS ix_veriler_tarih ON veriler("Tarih");
+                CREATE INDEX IF NOT EXISTS ix_veriler_kategori ON veriler("Kategori");
+                CREATE TABLE IF NOT EXISTS kategoriler ("Kategori" TEXT PRIMARY KEY, "Tur" TEXT, "VarsayilanGun" INTEGER);
+                CREATE TABLE IF NOT EXISTS meta (anahtar TEXT PRIMARY KEY, deger INTEGER);
+            ''')
+
+    def _kolonlar(self): return ", ".join(f'"{c}"' for c in KOLONLAR)
+
+    def _kayitlar(self, df):
+        save_df = satirlari_hazirla(df); id_ata(save_df)
+        save_df["Durum"] = durum_cevir(save_df["Durum"]).astype(int)
+        save_df["Tutar"] = save_df["Tutar"].astype(float)
+        return save_df[KOLONLAR].values.tolist()
+
+    def _sorgu(self, sql, parametreler=()):
+        with self._kilit: return pd.read_sql_query(sql, self._db, params=parametreler)
+
+    def _kosul(self, yil, ay):
+        if yil is None: return "", ()
+        return ' WHERE "Tarih" >= ? AND "Tarih" < ?', _ay_araligi(yil, ay)
+
+    def read_ledger(self, yil=None, ay=None):
+        kosul, p = self._kosul(yil, ay)
+        return normalize_et(self._sorgu(f"SELECT {self._kolonlar()} FROM veriler{kosul} ORDER BY rowid", p), self.bellek_raporu)
+
+    def years(self):
+        df = self._sorgu('SELECT DISTINCT CAST(substr("Tarih", 1, 4) AS INTEGER) AS yil FROM veriler ORDER BY yil DESC')
+        return [int(y) for y in df["yil"].dropna()]
+
+    def aylik_ozet(self):
+        df = self._sorgu('''SELECT CAST(substr("Tarih", 1, 4) AS INTEGER) AS "Yil", CAST(substr("Tarih", 6, 2) AS INTEGER) AS "Ay",
+            "Tür", "Kategori", "Durum", SUM("Tutar") AS "Tutar", COUNT(*) AS "Adet"
+            FROM veriler GROUP BY 1, 2, 3, 4, 5 ORDER BY 1, 2, 3, 4, 5''')
+        if df.empty: return bos_ozet()
+        df["Durum"] = df["Durum"].astype(bool)
+        return df
+
+    def read_rows(self, ids):
+        ids = [str(i) for i in ids]
+        # SQLite parametre sınırı için parça parça
+        parcalar = [self._sorgu(f'SELECT {self._kolonlar()} FROM veriler WHERE "ID" IN ({", ".join("?" * len(p))})', p)
+                    for p in (ids[i:i + 500] for i in range(0, len(ids), 500))]
+        return normalize_et(pd.concat(parcalar, ignore_index=True)) if parcalar else bos_defter()
+
+    def read_categories(self):
+        df = self._sorgu('SELECT "Kategori", "Tur", "VarsayilanGun" FROM kategoriler ORDER BY rowid')
+        if df.empty:
+            df = varsayilan_kategoriler(); self.write_categories(df)
+        return df
+
+    def write_categories(self, df):
+        kat = df.reindex(columns=KATEGORI_KOLONLARI)
+        satirlar = kat.astype(object).where(kat.notna(), None).values.tolist()
+        with self._kilit, self._db:
+            self._db.execute("DELETE FROM kategoriler")
+            self._db.executemany('INSERT OR REPLACE INTO kategoriler ("Kategori", "Tur", "VarsayilanGun") VALUES (?, ?, ?)', satirlar)
+
+    def append_rows(self, df):
+        if df.empty: return 0
+        satirlar = self._kayitlar(df)
+        with self._kilit, self._db:
+            self._db.executemany(f"INSERT INTO veriler ({self._kolonlar()}) VALUES ({', '.join('?' * len(KOLONLAR))})", satirlar)
+        return len(satirlar)
+
+    def update_rows(self, df):
+        if df.empty: return 0
+        atama = ", ".join(f'"{c}" = ?' for c in KOLONLAR[:-1])
+        satirlar = self._kayitlar(df)
+        with self._kilit, self._db:
+            cur = self._db.executemany(f'UPDATE veriler SET {atama} WHERE "ID" = ?', satirlar)
+        return cur.rowcount
+
+    def delete_rows(self, ids):
+        with self._kilit, self._db:
+            cur = self._db.executemany('DELETE FROM veriler WHERE "ID" = ?', [(str(i),) for i in ids])
+        return cur.rowcount
+
+    def rewrite(self, df):
+        satirlar = self._kayitlar(df)
+        with self._kilit, self._db:
+            self._db.execute("DELETE FROM veriler")
+            self._db.executemany(f"INSERT INTO veriler ({self._kolonlar()}) VALUES ({', '.join('?' * len(KOLONLAR))})", satirlar)
+
+    def read_version(self):
+        with self._kilit:
+            r = self._db.execute("SELECT deger FROM meta WHERE anahtar = 'surum'").fetchone()
+        return str(r[0]) if r else "0"
+
+    def write_version(self, surum):
+        with self._kilit, self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta (anahtar, deger) VALUES ('surum', ?)", (str(surum),))
+        return str(surum)
+
+def depo_olustur(ayar, conn_fabrikasi):
+    """
+    st.secrets["depo"] ayarına göre depoyu seçer:
+        [depo]
+        tur = "sqlite"      # varsayılan "gsheets"; yıllara bölünmüş sayfalar için "gsheets_yillik"
+        yol = "butce.db"
+    """
+    ayar = dict(ayar or {})
+    if ayar.get("tur", "gsheets") == "sqlite": return SqliteDepo(ayar.get("yol", "butce.db"))
+    if ayar.get("tur") == "gsheets_yillik": return YillikSheetsDepo(conn_fabrikasi())
+    return SheetsDepo(conn_fabrikasi())
+
+def depoyu_tasi(kaynak, hedef):
+    """
+    Tek seferlik göç: kaynak depodaki defter ve kategorileri hedefe kopyalar.
+    Sheets kaynağı ham okunur (read_ledger tarihsiz satırları atar); tarihi boş
+    ya da okunamayan satır varsa hiçbir şey yazılmadan ValueError ile durur.
+    """
+    ham = getattr(kaynak, "_ham_oku", None)
+    df = ham() if ham else kaynak.read_ledger()
+    tarihsiz = tarihsiz_satirlar(df)
+    if not tarihsiz.empty: raise _tarihsiz_hatasi(tarihsiz)
+    kat = kaynak.read_categories()
+    hedef.rewrite(df); hedef.write_categories(kat)
+    hedef.write_version(yeni_surum())
+    return len(df), len(kat)
@@ -0,0 +1,71 @@
+import importlib.util
+import io
+import pandas as pd
+from .depo import satirlari_hazirla
+from .sema import KOLONLAR
+
+# ad: (uzantı, MIME türü, gereken modüller — biri yeterli)
+BICIMLER = {
+    "CSV": (".csv", "text/csv", ()),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ("xlsxwriter", "openpyxl")),
+    "Parquet": (".parquet", "application/vnd.apache.parquet", ("pyarrow",)),
+}
+EXCEL_SATIR_SINIRI = 1_048_575  # başlık satırı hariç
+PARCA = 50_000
+
+def kullanilabilir_bicimler():
+    """Kurulu bağımlılıklarla yazılabilen biçimler; CSV her zaman vardır."""
+    return [ad for ad, (_, _, moduller) in BICIMLER.items() if not moduller or any(importlib.util.find_spec(m) for m in moduller)]
+
+def aralik_filtrele(df, bas=None, bit=None):
+    """Tarihi [bas, bit] aralığında olan satırlar (iki uç dahil); None verilen uç sınırsızdır."""
+    maske = pd.Series(True, index=df.index)
+    if bas is not None: maske &= df["Tarih"] >= pd.Timestamp(bas)
+    if bit is not None: maske &= df["Tarih"] < pd.Timestamp(bit) + pd.Timedelta(days=1)
+    return df[maske]
+
+def _parcalar(df, parca):
+    for bas in range(0, len(df), parca): yield df.iloc[bas:bas + parca]
+
+def _csv(df, parca):
+    # Satırlar sayfaya yazıldıkları biçimde (yedek CSV'si tasi.py ile geri yüklenebilir); her parça ayrı metne çevrilir
+    cikti = io.BytesIO()
+    if df.empty: cikti.write(pd.DataFrame(columns=KOLONLAR).to_csv(index=False).encode("utf-8"))
+    for i, p in enumerate(_parcalar(df, parca)): cikti.write(satirlari_hazirla(p).to_csv(index=False, header=i == 0).encode("utf-8"))
+    cikti.seek(0)
+    return cikti
+
+def _excel(df, parca):
+    if len(df) > EXCEL_SATIR_SINIRI: raise ValueError(f"Excel en çok {EXCEL_SATIR_SINIRI:,} satır alır; CSV ya da Parquet seçin.")
+    motor = "xlsxwriter" if importlib.util.find_spec("xlsxwriter") else "openpyxl"
+    cikti = io.BytesIO()
+    with pd.ExcelWriter(cikti, engine=motor) as yazici:
+        df[KOLONLAR].head(0).to_excel(yazici, sheet_name="Veriler", index=False)
+        # Tarihler Excel tarihi, tutarlar sayı olarak kalır; kategorik kolonlar parça parça düz metne açılır
+        for i, p in enumerate(_parcalar(df[KOLONLAR], parca)):
+            p.astype({k: object for k in ["Kategori", "Tür", "Açıklama"]}).to_excel(yazici, sheet_name="Veriler", index=False, header=False, startrow=1 + i * parca)
+    cikti.seek(0)
+    return cikti
+
+def _parquet(df, parca):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    df = df[KOLONLAR]
+    sema = pa.Schema.from_pandas(df.head(0), preserve_index=False)
+    cikti = io.BytesIO()
+    with pq.ParquetWriter(cikti, sema) as yazici:
+        for p in _parcalar(df, parca): yazici.write_table(pa.Table.from_pandas(p, schema=sema, preserve_index=False))
+    cikti.seek(0)
+    return cikti
+
+def disa_aktar(df, bicim="CSV", parca=PARCA):
+    """
+    Tipli defteri seçilen biçimde, başa sarılmış bir BytesIO olarak döner
+    (st.download_button doğrudan alır; getvalue() ikinci bir kopya çıkarırdı).
+    Yazma parça parça yapılır: defterin tamamının metne çevrilmiş ikinci bir
+    kopyası hiçbir anda oluşmaz.
+    """
+    if bicim not in BICIMLER: raise ValueError(f"Bilinmeyen biçim: {bicim}")
+    return {"CSV": _csv, "Excel": _excel, "Parquet": _parquet}[bicim](df, parca)
+
+def dosya_adi(bicim, etiket="yedek"): return f"{etiket}{BICIMLER[bicim][0]}"
@@ -0,0 +1,149 @@
+import csv
+import numpy as np
+import pandas as pd
+from .arama import tr_kucult
+from .sema import bos_defter, normalize_et
+from .tekrar import guvenli_int_seri, son_odemeleri_hesapla
+
+# Banka / kart ekstrelerinde sık görülen kolon adları (Türkçe küçük harfe çevrilmiş halleriyle aranır)
+ADAYLAR = {
+    "Tarih": ["tarih", "işlem tarihi", "islem tarihi", "valör", "date", "transaction date"],
+    "Tutar": ["tutar", "işlem tutarı", "islem tutari", "miktar", "amount"],
+    "Açıklama": ["açıklama", "aciklama", "işlem açıklaması", "islem aciklamasi", "description", "detay"],
+}
+
+def kolonlari_esle(basliklar, esleme=None):
+    """Ekstre başlıklarını Tarih/Tutar/Açıklama'ya eşler; esleme verilirse o kullanılır. Döner: {ekstre kolonu: şema kolonu}."""
+    if esleme: return dict(esleme)
+    kucuk = {tr_kucult(str(b)).strip(): b for b in basliklar}
+    sonuc = {}
+    for hedef, adaylar in ADAYLAR.items():
+        bulunan = next((kucuk[a] for a in adaylar if a in kucuk), None)
+        if bulunan is None: raise ValueError(f"Ekstrede {hedef} kolonu bulunamadı: {list(basliklar)}")
+        sonuc[bulunan] = hedef
+    return sonuc
+
+def _ayrac(kaynak, kodlama):
+    # Ayraç ilk satırlardan sezilir; C motoru sep=None ile çalışmadığından tahmini biz yaparız
+    if hasattr(kaynak, "read"):
+        kaynak.seek(0); ornek = kaynak.read(4096); kaynak.seek(0)
+    else:
+        with open(kaynak, "rb") as f: ornek = f.read(4096)
+    if isinstance(ornek, bytes): ornek = ornek.decode(kodlama, errors="ignore")
+    try: return csv.Sniffer().sniff(ornek.splitlines()[0], delimiters=",;\t|").delimiter
+    except (csv.Error, IndexError): return ","
+
+def _eslestirme_metni(seri):
+    # Bankalar büyük harfle yazar: "MIGROS" tr_kucult ile "mıgros" olur; eşleşmede ı/i ayrımı yapılmaz
+    return tr_kucult(seri).str.replace("ı", "i", regex=False) if not isinstance(seri, str) else tr_kucult(seri).replace("ı", "i")
+
+def tarih_cevir(seri):
+    """Önce ISO (2024-03-05) okunur; olmayanlar gün önde (05.03.2024, 05/03/2024) okunur. Okunamayanlar NaT."""
+    tarih = pd.to_datetime(seri, format="ISO8601", errors="coerce")
+    kalan = tarih.isna() & seri.notna()
+    if kalan.any(): tarih[kalan] = pd.to_datetime(seri[kalan], format="mixed", dayfirst=True, errors="coerce")
+    return tarih.dt.normalize()
+
+def tutar_cevir(seri):
+    """"1.234,56" / "-45,90 TL" / "1234.56" biçimlerini sayıya çevirir (vektörel)."""
+    if pd.api.types.is_numeric_dtype(seri): return seri.astype(float)
+    metin = seri.astype(str).str.replace(r"[^\d,.\-+]", "", regex=True)
+    # Virgül varsa Türkçe biçim: nokta binlik ayracı, virgül ondalık
+    turkce = metin.str.contains(",", regex=False)
+    metin = metin.where(~turkce, metin.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(metin, errors="coerce")
+
+def kural_listesi(df_kat, ek_kurallar=None):
+    """
+    (anahtar, kategori, tür) kuralları: önce elle verilen ek kurallar
+    ({"migros": "Market"}), sonra her kategorinin "#etiket" hali ve adı.
+    Kurallar sırayla uygulanır, ilk eşleşen kazanır.
+    """
+    tur = dict(zip(df_kat["Kategori"], df_kat["Tur"]))
+    kurallar = [(_eslestirme_metni(str(a)).strip(), k, tur.get(k)) for a, k in (ek_kurallar or {}).items() if str(a).strip()]
+    for k, t in tur.items():
+        ad = _eslestirme_metni(str(k)).strip()
+        kurallar += [("#" + ad.replace(" ", ""), k, t), (ad, k, t)]
+    return kurallar
+
+def kurallari_coz(metin):
+    """Her satırı "anahtar=Kategori" olan metni kural sözlüğüne çevirir; hatalı satırlar atlanır."""
+    satirlar = (s.split("=", 1) for s in (metin or "").splitlines() if "=" in s)
+    return {a.strip(): k.strip() for a, k in satirlar if a.strip() and k.strip()}
+
+def kategorileri_ata(aciklama, tur, kurallar):
+    """
+    Kuralları satırlara değil kurallar üzerinde dönerek uygular; her kural tek bir vektörel str.contains'tir.
+    Hiçbir kurala uymayanların kategorisi boş kalır (Kategoriler'de olmayan bir ad uydurulmaz).
+    """
+    metin = _eslestirme_metni(aciklama.fillna("").astype(str))
+    kategori = pd.Series(pd.NA, index=aciklama.index, dtype=object)
+    for anahtar, kat, kat_tur in kurallar:
+        bos = kategori.isna()
+        if not bos.any(): break
+        maske = bos & metin.str.contains(anahtar, regex=False)
+        if kat_tur is not None: maske &= tur == kat_tur
+        kategori[maske] = kat
+    return kategori
+
+def _parca_donustur(parca, esleme, isaret):
+    parca = parca.rename(columns=esleme)
+    tutar = tutar_cevir(parca["Tutar"])
+    # Banka hesabında eksi tutar gider; kredi kartı ekstrelerinde çoğunlukla artı tutar gider
+    gider = tutar < 0 if isaret == "eksi_gider" else tutar > 0
+    return pd.DataFrame({
+        "Tarih": tarih_cevir(parca["Tarih"]),
+        "Tür": np.where(gider, "Gider", "Gelir"), "Tutar": tutar.abs(),
+        "Açıklama": parca["Açıklama"].fillna("").astype(str).str.strip(),
+    })[lambda d: d["Tarih"].notna() & d["Tutar"].notna() & (d["Tutar"] > 0)]
+
+def icerik_ozeti(df):
+    """(tarih, tutar, açıklama) içerik özeti (uint64); aynı içerikli satırlar aynı değeri alır."""
+    if df.empty: return pd.Series(dtype="uint64")
+    anahtar = pd.DataFrame({
+        "t": pd.to_datetime(df["Tarih"]).to_numpy().astype("datetime64[D]").astype("int64"),
+        "u": df["Tutar"].astype(float).round(2).to_numpy(),
+        "a": tr_kucult(df["Açıklama"].fillna("").astype(str)).str.replace(r"\s+", " ", regex=True).str.strip().to_numpy(),
+    })
+    return pd.Series(pd.util.hash_pandas_object(anahtar, index=False).to_numpy(), index=df.index)
+
+def tekrarlari_ayikla(yeni, mevcut):
+    """
+    Defterde zaten olan satırları atar. Eş içerikli satırlar sıra numarasıyla
+    ayrılır: defterde 2 kez varsa, ekstredeki 3. kopya yine eklenir.
+    """
+    ozet = icerik_ozeti(yeni)
+    sira = ozet.groupby(ozet, sort=False).cumcount()
+    var = icerik_ozeti(mevcut).value_counts()
+    onceki = ozet.map(var).fillna(0).astype(int)
+    return yeni[(sira >= onceki).to_numpy()]
+
+def ekstre_oku(kaynak, df_kat, mevcut_okuyucu, esleme=None, ek_kurallar=None, isaret="eksi_gider", parca=5000, kodlama="utf-8-sig"):
+    """
+    Banka / kart ekstresi CSV'sini parça parça okur ve deftere eklenecek satırları döner.
+    Ham dosya hiçbir zaman bütünüyle belleğe alınmaz; yalnızca eşlenen üç kolon tutulur.
+    mevcut_okuyucu(yillar) ekstrenin kapsadığı yılların defter satırlarını döner (tekrar kontrolü için).
+    Döner: (yeni satırlar, atlanan tekrar sayısı)
+    """
+    ayrac = _ayrac(kaynak, kodlama)
+    basliklar = pd.read_csv(kaynak, nrows=0, sep=ayrac, encoding=kodlama).columns
+    esleme = kolonlari_esle(basliklar, esleme)
+    if hasattr(kaynak, "seek"): kaynak.seek(0)
+    okuyucu = pd.read_csv(kaynak, sep=ayrac, encoding=kodlama, usecols=list(esleme), dtype=str, chunksize=parca)
+    parcalar = [_parca_donustur(p, esleme, isaret) for p in okuyucu]
+    satirlar = pd.concat(parcalar, ignore_index=True) if parcalar else pd.DataFrame(columns=["Tarih", "Tür", "Tutar", "Açıklama"])
+    if satirlar.empty: return bos_defter(), 0
+
+    yeni = tekrarlari_ayikla(satirlar, mevcut_okuyucu(sorted(satirlar["Tarih"].dt.year.unique().tolist())))
+    atlanan = len(satirlar) - len(yeni)
+    if yeni.empty: return bos_defter(), atlanan
+
+    kategori = kategorileri_ata(yeni["Açıklama"], pd.Series(yeni["Tür"], index=yeni.index), kural_listesi(df_kat, ek_kurallar))
+    gunler = df_kat.drop_duplicates("Kategori").set_index("Kategori")["VarsayilanGun"]
+    vg = guvenli_int_seri(kategori.map(gunler))
+    son_odeme = son_odemeleri_hesapla(yeni["Tarih"].reset_index(drop=True), vg.reset_index(drop=True))
+    return normalize_et(pd.DataFrame({
+        "Tarih": yeni["Tarih"].to_numpy(), "Kategori": kategori.to_numpy(), "Tür": yeni["Tür"].to_numpy(),
+        "Tutar": yeni["Tutar"].to_numpy(), "Son Ödeme Tarihi": son_odeme.to_numpy(),
+        "Açıklama": yeni["Açıklama"].to_numpy(), "Durum": False, "ID": pd.NA,
+    })), atlanan
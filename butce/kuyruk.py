@@ -0,0 +1,102 @@
+import atexit
+import threading
+import time
+import pandas as pd
+from .depo import filtrele, id_ata
+from .sema import bos_defter, normalize_et
+
+def kota_hatasi_mi(hata):
+    """Sheets kota / hız sınırı hatası mı (HTTP 429, RESOURCE_EXHAUSTED)."""
+    yanit = getattr(hata, "response", None)
+    if getattr(yanit, "status_code", None) == 429: return True
+    metin = str(hata).lower()
+    return "429" in metin or "quota" in metin or "rate limit" in metin or "resource_exhausted" in metin
+
+class YazmaKuyrugu:
+    """
+    Yeni defter satırları için arkadan yazma kuyruğu.
+    ekle() satırlara ID verip bellekte bekletir; bekleme saniye boyunca yeni
+    satır gelmezse (ya da bosalt() çağrılınca) hepsi tek append_rows ile
+    yazılır. Kota hatasında üstel bekleme ile yeniden denenir; başarısız
+    satırlar kuyrukta kalır. Kuyruk süreç başınadır, aynı uygulamayı kullanan
+    tüm oturumlar aynı kilidi paylaşır.
+    """
+    def __init__(self, depo, bekleme=3.0, deneme=5, ilk_bekleme=1.0, uyku=time.sleep):
+        self.depo = depo
+        self.bekleme = bekleme
+        self.deneme = deneme
+        self.ilk_bekleme = ilk_bekleme
+        self.uyku = uyku
+        self.hata = None
+        self.degisim = 0
+        self._kilit = threading.Lock()
+        self._yazma_kilidi = threading.Lock()
+        self._bekleyen = []
+        self._ucusta = 0
+        self._zamanlayici = None
+        atexit.register(self.bosalt)
+
+    @property
+    def bekleyen(self):
+        with self._kilit: return sum(len(p) for p in self._bekleyen)
+
+    def ekle(self, df):
+        """Satırları kuyruğa alır ve boşta kalma sayacını yeniden başlatır. Eklenen satır sayısını döner."""
+        if df.empty: return 0
+        df = df.copy(); id_ata(df)
+        with self._kilit:
+            self._bekleyen.append(df)
+            self.degisim += 1
+            if self._zamanlayici is not None: self._zamanlayici.cancel()
+            self._zamanlayici = threading.Timer(self.bekleme, self._arkada)
+            self._zamanlayici.daemon = True
+            self._zamanlayici.start()
+        return len(df)
+
+    def bekleyenler(self, yil=None, ay=None):
+        """
+        Henüz yazılmamış satırlar (tipli); ekranda hemen gösterilmek içindir.
+        O anda gönderilmekte olanlar dahil edilmez: yazma biter bitmez önbellekte
+        görünürler, iki kez sayılmazlar.
+        """
+        with self._kilit: parcalar = self._bekleyen[self._ucusta:]
+        if not parcalar: return bos_defter()
+        return filtrele(normalize_et(pd.concat(parcalar, ignore_index=True)), yil, ay)
+
+    def _arkada(self):
+        try: self.bosalt()
+        except Exception: pass
+
+    def arkada_bosalt(self):
+        if self.bekleyen: threading.Thread(target=self._arkada, daemon=True).start()
+
+    def bosalt(self, deneme=None):
+        """Bekleyen tüm satırları tek yazmada gönderir (eşzamanlı). Yazılan satır sayısını döner."""
+        deneme_sayisi = deneme or self.deneme
+        with self._yazma_kilidi:
+            with self._kilit:
+                if self._zamanlayici is not None: self._zamanlayici.cancel(); self._zamanlayici = None
+                parcalar = list(self._bekleyen)
+            if not parcalar: return 0
+            toplu = pd.concat(parcalar, ignore_index=True)
+            bekle = self.ilk_bekleme
+            kalan = toplu
+            for i in range(deneme_sayisi):
+                with self._kilit: self._ucusta = len(parcalar); self.degisim += 1
+                try:
+                    # Önceki deneme satırları yazıp sonra hata vermiş olabilir; yazılmış ID'ler yeniden gönderilmez
+                    if i: kalan = kalan[~kalan["ID"].isin(self.depo.read_rows(kalan["ID"])["ID"].astype(str))]
+                    if not kalan.empty: self.depo.append_rows(kalan)
+                    break
+                except Exception as e:
+                    with self._kilit: self._ucusta = 0; self.degisim += 1
+                    self.hata = str(e)
+                    if not kota_hatasi_mi(e) or i == deneme_sayisi - 1: raise
+                    self.uyku(bekle); bekle *= 2
+            with self._kilit:
+                # Yazma sürerken eklenenler kuyrukta kalır; yalnızca gönderilen parçalar düşülür
+                del self._bekleyen[:len(parcalar)]
+                self._ucusta = 0
+                self.degisim += 1
+            self.hata = None
+            return len(toplu)
@@ -0,0 +1,86 @@
+import json
+import logging
+import logging.handlers
+import time
+from datetime import datetime
+
+_gunlukler = {}
+
+def _gunluk(yol, en_buyuk=1_000_000, yedek=3):
+    # Dosya başına tek işleyici; Streamlit her yeniden çalıştırmada modülü değil betiği çalıştırır
+    if yol not in _gunlukler:
+        g = logging.getLogger(f"butce.olcum.{yol}")
+        g.setLevel(logging.INFO); g.propagate = False
+        isleyici = logging.handlers.RotatingFileHandler(yol, maxBytes=en_buyuk, backupCount=yedek, encoding="utf-8")
+        isleyici.setFormatter(logging.Formatter("%(message)s"))
+        g.addHandler(isleyici)
+        _gunlukler[yol] = g
+    return _gunlukler[yol]
+
+class _Bos:
+    """Kapalı ölçümde kullanılan tek nesne: hiçbir şey ölçmez, yazılan bilgiler atılır."""
+    def __enter__(self): return {}
+    def __exit__(self, *hata): return False
+
+_BOS = _Bos()
+
+class _Asama:
+    def __init__(self, olcum, ad, bilgi):
+        self.olcum, self.kayit = olcum, {"ad": ad, **bilgi}
+
+    def __enter__(self):
+        self.bas = time.perf_counter()
+        self.kayit["bas_ms"] = round((self.bas - self.olcum.bas) * 1000, 3)
+        return self.kayit
+
+    def __exit__(self, tur, deger, iz):
+        self.kayit["ms"] = round((time.perf_counter() - self.bas) * 1000, 3)
+        # st.rerun / st.stop da istisna olarak gelir; aşama yine kaydedilir
+        if tur is not None: self.kayit["kesildi"] = tur.__name__
+        self.olcum.asamalar.append(self.kayit)
+        return False
+
+class Olcum:
+    """
+    Bir yeniden çalıştırmanın aşama süreleri.
+        with olcum.asama("okuma") as a: df = ...; a["satir"] = len(df)
+    Her aşama duvar saati süresini (ms) ve içeride yazılan satır/bayt bilgisini
+    tutar. Kapalıyken asama() tek bir boş nesne döner, ölçüm yapılmaz.
+    """
+    def __init__(self, acik=False, gunluk=None):
+        self.acik = acik
+        self.gunluk = gunluk
+        self.asamalar = []
+        self.baslangic = time.time()
+        self.bas = time.perf_counter()
+        self.bitti = False
+
+    def asama(self, ad, **bilgi):
+        if not self.acik: return _BOS
+        return _Asama(self, ad, bilgi)
+
+    def kayit(self):
+        return {"zaman": datetime.fromtimestamp(self.baslangic).isoformat(timespec="seconds"),
+                # İç içe aşamalar iki kez sayılmasın: son biten aşamanın bitişi
+                "toplam_ms": round(max((a["bas_ms"] + a["ms"] for a in self.asamalar), default=0), 3), "asamalar": self.asamalar}
+
+    def bitir(self):
+        """Kaydı döner ve günlük dosyası verildiyse JSON satırı olarak ekler (bir kez)."""
+        if not self.acik or self.bitti: return None
+        self.bitti = True
+        k = self.kayit()
+        if self.gunluk: _gunluk(self.gunluk).info(json.dumps(k, ensure_ascii=False))
+        return k
+
+def olcum_baslat(durum, acik=False, gunluk=None):
+    """
+    Oturum durumunda yeni bir Olcum başlatır. st.rerun ile yarıda kalan önceki
+    çalıştırmanın kaydı burada kapatılıp günlüğe yazılır. Döner: (yeni, önceki kayıt)
+    """
+    onceki = durum.get("olcum")
+    onceki_kayit = None
+    if onceki is not None and onceki.acik:
+        onceki_kayit = onceki.kayit()
+        onceki.bitir()
+    durum["olcum"] = Olcum(acik, gunluk)
+    return durum["olcum"], onceki_kayit
@@ -0,0 +1,188 @@
+import threading
+import time
+import pandas as pd
+from .depo import KOLONLAR, VERI_SAYFASI, KATEGORI_SAYFASI, id_ata, filtrele, yeni_surum, yillar
+from .sema import KATEGORIK_KOLONLAR, birlestir, kategorileri_genislet, normalize_et
+from .ozet import aylik_ozet, ozet_birlestir
+
+OZET = "Ozet"
+
+class OnbellekliDepo:
+    """
+    Depo önünde süreç içi önbellek.
+    Okunan tablolar veri sürümüyle (depodaki sürüm belirteci) birlikte saklanır;
+    sürüm değişmedikçe ağa gidilmez. Kendi yazmalarımız önbelleği atmak yerine
+    yerinde günceller ve yeni bir sürüm yazar.
+    """
+    def __init__(self, depo, kontrol_araligi=10):
+        self.depo = depo
+        self.kontrol_araligi = kontrol_araligi
+        self.sayac = {"isabet": 0, "iska": 0, "surum_kontrol": 0}
+        self._kilit = threading.RLock()
+        self._tablolar = {}
+        self._surum = None
+        self._son_kontrol = float("-inf")
+        # Elle tazeleme sayısı; sürümle birlikte türetilmiş önbelleklerin (arama indeksi, dışa aktarım) anahtarına girer
+        self.tazeleme = 0
+
+    @property
+    def surum(self): return self._surum
+
+    def surumu_kontrol_et(self, zorla=False):
+        """Uzak sürümü okur; değişmişse önbelleği boşaltır. Güncel sürümü döner."""
+        with self._kilit:
+            if not zorla and time.monotonic() - self._son_kontrol < self.kontrol_araligi: return self._surum
+            self.sayac["surum_kontrol"] += 1
+            try: uzak = self.depo.read_version()
+            except Exception:
+                # Geçici okuma hatasında bilinen sürümle devam edilir; kontrol bir sonraki çağrıda tekrarlanır
+                if self._surum is None: raise
+                return self._surum
+            self._son_kontrol = time.monotonic()
+            if uzak != self._surum:
+                self._tablolar.clear()
+                self._surum = uzak
+            return self._surum
+
+    def yenile(self):
+        """
+        Tüm tabloları atar ve sürümü yeniden okur. Sayfada elle yapılan
+        değişiklikler sürümü değiştirmez; onları görmenin yolu budur.
+        """
+        with self._kilit:
+            self._tablolar.clear()
+            self.tazeleme += 1
+            return self.surumu_kontrol_et(zorla=True)
+
+    def _getir(self, ad, okuyucu):
+        with self._kilit:
+            self.surumu_kontrol_et()
+            if ad in self._tablolar: self.sayac["isabet"] += 1
+            else:
+                self.sayac["iska"] += 1
+                self._tablolar[ad] = okuyucu()
+            sonuc = self._tablolar[ad]
+            # Sığ kopya: çağıranın kolon atamaları önbellekteki tabloya dokunmaz
+            return sonuc.copy(deep=False) if isinstance(sonuc, pd.DataFrame) else sonuc
+
+    def read_ledger(self, yil=None, ay=None):
+        # Yıllara bölünmüş depoda yılın tamamı bir kez okunur, aylar bellekte süzülür
+        if yil is not None and self.depo.yil_parcali:
+            return filtrele(self._getir((VERI_SAYFASI, int(yil)), lambda: self.depo.read_ledger(yil)), yil, ay)
+        if yil is not None and self.depo.sorgu_destekli:
+            return self._getir((VERI_SAYFASI, yil, ay), lambda: self.depo.read_ledger(yil, ay))
+        return filtrele(self._getir(VERI_SAYFASI, self.depo.read_ledger), yil, ay)
+
+    def read_categories(self): return self._getir(KATEGORI_SAYFASI, self.depo.read_categories)
+
+    def years(self):
+        if self.depo.sorgu_destekli: return self._getir(("yillar",), self.depo.years)
+        return yillar(self.read_ledger())
+
+    def aylik_ozet(self):
+        """(yıl, ay, Tür, Kategori, Durum) özeti; sürüm başına bir kez kurulur, yazmalarda yerinde güncellenir."""
+        if self.depo.sorgu_destekli: return self._getir(OZET, self.depo.aylik_ozet)
+        return self._getir(OZET, lambda: aylik_ozet(self.read_ledger()))
+
+    def read_rows(self, ids):
+        """ID'si verilen satırların güncel hali; defter önbellekteyse oradan, değilse depodan okunur."""
+        ids = set(map(str, ids))
+        with self._kilit:
+            self.surumu_kontrol_et()
+            if VERI_SAYFASI in self._tablolar:
+                tum = self._tablolar[VERI_SAYFASI]
+                return tum[tum["ID"].isin(ids)]
+        return self.depo.read_rows(ids)
+
+    @property
+    def bellek_raporu(self): return getattr(self.depo, "bellek_raporu", {})
+
+    def _eski_satirlar(self, ids):
+        """Güncellenecek/silinecek satırların yazmadan önceki hali; özetten düşmek için."""
+        with self._kilit:
+            if OZET not in self._tablolar: return None
+            if VERI_SAYFASI in self._tablolar:
+                tum = self._tablolar[VERI_SAYFASI]
+                return tum[tum["ID"].isin(ids)]
+            return self.depo.read_rows(ids)
+
+    def _yaz(self, islem, guncellemeler, yil_guncelle=None):
+        """
+        Yazma işlemini yapar ve yeni bir sürüm belirteci yazar. Uzak sürüm
+        yazmadan önce bizimkiyle aynıysa önbellek yerinde güncellenir; değilse
+        önbellek bir sonraki okumada tazelenir.
+        yil_guncelle(yil, tablo), yıllara bölünmüş depoda önbellekteki yıl tablolarını günceller.
+        """
+        with self._kilit:
+            onceki = self.depo.read_version()
+            sonuc = islem()
+            try: yeni = self.depo.write_version(yeni_surum())
+            except Exception:
+                # Veri yazıldı, yalnızca sürüm yazılamadı: yazma tekrarlanmasın diye hata yutulur, önbellek atılır
+                self._tablolar.clear(); self._surum = None; self._son_kontrol = float("-inf")
+                return sonuc
+            if onceki == self._surum:
+                for ad in list(self._tablolar):
+                    if ad in guncellemeler: guncelle = guncellemeler[ad]
+                    elif yil_guncelle and self.depo.yil_parcali and isinstance(ad, tuple) and len(ad) == 2 and ad[0] == VERI_SAYFASI:
+                        guncelle = lambda tablo, yil=ad[1]: yil_guncelle(yil, tablo)
+                    # Depoda hesaplanan sorgu sonuçları (yıl/ay dilimleri, toplamlar) yeniden sorulur
+                    elif isinstance(ad, tuple): guncelle = lambda tablo: None
+                    else: continue
+                    # Yazma zaten yapıldı; önbellek güncellenemezse tablo atılır, hata kullanıcıya yansımaz
+                    try: tablo = guncelle(self._tablolar[ad])
+                    except Exception: tablo = None
+                    # None: yerinde güncellenemedi, bir sonraki okumada yeniden kurulur
+                    if tablo is None: del self._tablolar[ad]
+                    else: self._tablolar[ad] = tablo
+            else: self._tablolar.clear()
+            self._surum = yeni
+            self._son_kontrol = time.monotonic()
+            return sonuc
+
+    def append_rows(self, df):
+        df = df.copy(); id_ata(df)
+        yeni = normalize_et(df)
+        yil = yeni["Tarih"].dt.year
+        return self._yaz(lambda: self.depo.append_rows(df), {
+            VERI_SAYFASI: lambda eski: birlestir(eski, yeni),
+            OZET: lambda eski: ozet_birlestir(eski, eklenen=yeni),
+        }, lambda y, eski: birlestir(eski, yeni[yil == y]) if (yil == y).any() else eski)
+
+    def update_rows(self, df):
+        yeni = normalize_et(df)
+        once = self._eski_satirlar(set(yeni["ID"]))
+        def guncelle(eski, yeni=yeni):
+            eski = kategorileri_genislet(eski.set_index("ID"), yeni)
+            # Aynı kategori listesine çekilmeden kategorik kolonlara yerinde atama yapılamaz
+            y = yeni.set_index("ID").astype({col: eski[col].dtype for col in KATEGORIK_KOLONLAR})
+            ortak = y.index.intersection(eski.index)
+            eski.loc[ortak, KOLONLAR[:-1]] = y.loc[ortak, KOLONLAR[:-1]]
+            return eski.reset_index()[KOLONLAR]
+        def yil_guncelle(yil, eski):
+            # Yılda kalanlar yerinde güncellenir, başka yıla taşınanlar düşülür; bu yıla taşınıp gelen varsa tablo yeniden okunur
+            buraya = yeni[yeni["Tarih"].dt.year == yil]
+            if not buraya["ID"].isin(eski["ID"]).all(): return None
+            giden = eski["ID"].isin(yeni["ID"]) & ~eski["ID"].isin(buraya["ID"])
+            return guncelle(eski[~giden].reset_index(drop=True), buraya)
+        return self._yaz(lambda: self.depo.update_rows(df), {
+            VERI_SAYFASI: guncelle,
+            OZET: lambda eski: None if once is None else ozet_birlestir(eski, eklenen=yeni[yeni["ID"].isin(once["ID"])], cikan=once),
+        }, yil_guncelle)
+
+    def delete_rows(self, ids):
+        ids = set(map(str, ids))
+        once = self._eski_satirlar(ids)
+        sil = lambda eski: eski[~eski["ID"].isin(ids)].reset_index(drop=True)
+        return self._yaz(lambda: self.depo.delete_rows(ids), {
+            VERI_SAYFASI: sil,
+            OZET: lambda eski: None if once is None else ozet_birlestir(eski, cikan=once),
+        }, lambda y, eski: sil(eski))
+
+    def rewrite(self, df):
+        df = df.copy(); id_ata(df)
+        yeni = normalize_et(df)
+        return self._yaz(lambda: self.depo.rewrite(df), {VERI_SAYFASI: lambda eski: yeni, OZET: lambda eski: aylik_ozet(yeni)})
+
+    def write_categories(self, df):
+        return self._yaz(lambda: self.depo.write_categories(df), {KATEGORI_SAYFASI: lambda eski: df.copy()}, lambda y, eski: eski)
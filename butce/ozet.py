@@ -0,0 +1,62 @@
+import pandas as pd
+
+OZET_ANAHTARI = ["Yil", "Ay", "Tür", "Kategori", "Durum"]
+OZET_KOLONLARI = OZET_ANAHTARI + ["Tutar", "Adet"]
+
+def bos_ozet():
+    return pd.DataFrame({"Yil": pd.Series(dtype=int), "Ay": pd.Series(dtype=int), "Tür": pd.Series(dtype=object), "Kategori": pd.Series(dtype=object),
+                         "Durum": pd.Series(dtype=bool), "Tutar": pd.Series(dtype=float), "Adet": pd.Series(dtype=int)})
+
+def _topla(df):
+    if df.empty: return bos_ozet()
+    ozet = df.groupby(OZET_ANAHTARI, dropna=False, sort=True, observed=True).agg(Tutar=("Tutar", "sum"), Adet=("Adet", "sum")).reset_index()
+    # Özet küçük bir tablo; kategorik yerine düz metin tutulur ki birleştirmelerde tip kaybı olmasın
+    ozet[["Tür", "Kategori"]] = ozet[["Tür", "Kategori"]].astype(object)
+    return ozet
+
+def aylik_ozet(df):
+    """
+    (yıl, ay, Tür, Kategori, Durum) başına tutar toplamı ve kayıt sayısı.
+    Kartlar ve grafikler satırlar yerine bu tablodan beslenir.
+    """
+    if df.empty: return bos_ozet()
+    return _topla(pd.DataFrame({
+        "Yil": df["Tarih"].dt.year.astype(int), "Ay": df["Tarih"].dt.month.astype(int),
+        "Tür": df["Tür"], "Kategori": df["Kategori"], "Durum": df["Durum"].astype(bool),
+        "Tutar": df["Tutar"].astype(float), "Adet": 1,
+    }))
+
+def ozet_birlestir(ozet, eklenen=None, cikan=None):
+    """Özeti yerinde günceller: eklenen/çıkan satırların özetleri toplanır ya da düşülür, boşalan gruplar atılır."""
+    parcalar = [ozet]
+    if eklenen is not None and not eklenen.empty: parcalar.append(aylik_ozet(eklenen))
+    if cikan is not None and not cikan.empty:
+        eksi = aylik_ozet(cikan)
+        eksi[["Tutar", "Adet"]] = -eksi[["Tutar", "Adet"]]
+        parcalar.append(eksi)
+    if len(parcalar) == 1: return ozet
+    sonuc = _topla(pd.concat([p for p in parcalar if not p.empty], ignore_index=True))
+    return sonuc[sonuc["Adet"] > 0].reset_index(drop=True)
+
+def ozet_filtrele(ozet, yil=None, ay=None):
+    if yil is None: return ozet
+    ozet = ozet[ozet["Yil"] == int(yil)]
+    if ay is not None: ozet = ozet[ozet["Ay"] == int(ay)]
+    return ozet
+
+def ozet_kpi(ozet):
+    gider = ozet[ozet["Tür"] == "Gider"]
+    return {
+        "gelir": float(ozet.loc[ozet["Tür"] == "Gelir", "Tutar"].sum()), "gider": float(gider["Tutar"].sum()),
+        "bekleyen": float(gider.loc[~gider["Durum"].astype(bool), "Tutar"].sum()), "adet": int(ozet["Adet"].sum()),
+    }
+
+def gider_dagilimi(ozet, kolon):
+    """Giderlerin verilen kolona (Durum / Kategori) göre toplamı."""
+    return ozet[ozet["Tür"] == "Gider"].groupby(kolon, dropna=False)["Tutar"].sum().reset_index()
+
+def aylik_trend(ozet):
+    """Ay ay Gelir/Gider toplamları; Donem "YYYY-AA" biçimindedir."""
+    trend = ozet.groupby(["Yil", "Ay", "Tür"])["Tutar"].sum().reset_index()
+    trend["Donem"] = trend["Yil"].astype(str) + "-" + trend["Ay"].astype(str).str.zfill(2)
+    return trend
@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+
+KURLAR = ["USD", "EUR", "GRAM"]
+ONS_GRAM = 31.1035
+
+# --- KAYNAKLAR ---
+class YahooKaynagi:
+    """Yahoo Finance günlük kapanışları: dolar, euro ve ons altından hesaplanan gram altın (TL)."""
+    def getir(self, donem="5d"):
+        import yfinance as yf
+        kapanis = yf.download("TRY=X EURTRY=X GC=F", period=donem, progress=False)["Close"].ffill().dropna()
+        return pd.DataFrame({
+            "Tarih": pd.to_datetime(kapanis.index).tz_localize(None).normalize(),
+            "USD": kapanis["TRY=X"].to_numpy(), "EUR": kapanis["EURTRY=X"].to_numpy(),
+            "GRAM": (kapanis["GC=F"] / ONS_GRAM * kapanis["TRY=X"]).to_numpy(),
+        })
+
+class DosyaKaynagi:
+    """Tarih,USD,EUR,GRAM kolonlu yerel CSV; testlerde ve çevrimdışı çalışmada ağın yerine geçer."""
+    def __init__(self, yol): self.yol = yol
+
+    def getir(self, donem=None):
+        df = pd.read_csv(self.yol)
+        df["Tarih"] = pd.to_datetime(df["Tarih"]).dt.normalize()
+        return df[["Tarih"] + KURLAR]
+
+def kaynak_olustur(ayar):
+    """
+    st.secrets["piyasa"] ayarına göre kaynağı seçer:
+        [piyasa]
+        kaynak = "dosya"        # varsayılan "yahoo"
+        yol = "kurlar.csv"
+        depo = "piyasa.json"
+    """
+    ayar = dict(ayar or {})
+    if ayar.get("kaynak", "yahoo") == "dosya": return DosyaKaynagi(ayar.get("yol", "kurlar.csv"))
+    return YahooKaynagi()
+
+# --- KUR DEPOSU ---
+class KurDeposu:
+    """
+    Son kurlar ve günlük kur geçmişi için küçük bir JSON dosyası.
+    son() elde ne varsa hemen döner; değerler eskiyse tazeleme arka planda
+    bir iş parçacığında yapılır, sayfa ağ isteğini beklemez. Hata olursa
+    son bilinen değerler korunur ve hata_araligi sonra yeniden denenir.
+    """
+    def __init__(self, kaynak, yol="piyasa.json", yenileme_araligi=3600, hata_araligi=300):
+        self.kaynak = kaynak
+        self.yol = yol
+        self.yenileme_araligi = yenileme_araligi
+        self.hata_araligi = hata_araligi
+        self.hata = None
+        self._kilit = threading.Lock()
+        self._is = None
+        self._son_deneme = float("-inf")
+        self._veri = self._yukle()
+        self._gecmis = None
+
+    def _yukle(self):
+        try:
+            with open(self.yol, encoding="utf-8") as f: return json.load(f)
+        except (OSError, ValueError): return {"son": {}, "gecmis": {}}
+
+    def _kaydet(self, veri):
+        # Önce geçici dosyaya yazılır; yarım kalan yazma eski dosyayı bozmaz
+        gecici = f"{self.yol}.tmp"
+        with open(gecici, "w", encoding="utf-8") as f: json.dump(veri, f, ensure_ascii=False)
+        os.replace(gecici, self.yol)
+
+    def son(self):
+        """Son bilinen kurlar {"USD", "EUR", "GRAM", "zaman"}; hiç veri yoksa boş sözlük. Gerekirse arka planda tazeler."""
+        if self._eski_mi(): self.arkada_tazele()
+        return dict(self._veri["son"])
+
+    def _eski_mi(self):
+        zaman = self._veri["son"].get("zaman")
+        yas = time.time() - zaman if zaman else float("inf")
+        aralik = self.hata_araligi if self.hata else self.yenileme_araligi
+        return yas > self.yenileme_araligi and time.monotonic() - self._son_deneme > aralik
+
+    def arkada_tazele(self):
+        with self._kilit:
+            if self._is is not None and self._is.is_alive(): return
+            self._son_deneme = time.monotonic()
+            self._is = threading.Thread(target=self._tazele_guvenli, daemon=True)
+            self._is.start()
+
+    def _tazele_guvenli(self):
+        try: self.tazele(); self.hata = None
+        except Exception as e: self.hata = str(e)
+
+    def tazele(self):
+        """Kaynaktan okur, geçmişe ekler ve dosyaya yazar (eşzamanlı)."""
+        # Tam geçmiş bir kez çekilir (çok yıllık defterdeki eski işlemler de kendi kuruyla çevrilsin); sonra yalnızca son günler
+        tam = self._veri.get("tam", False)
+        yeni = self.kaynak.getir("5d" if tam else "max").dropna()
+        if yeni.empty: raise ValueError("Kur verisi boş")
+        veri = {"son": dict(self._veri["son"]), "gecmis": dict(self._veri["gecmis"]), "tam": True}
+        for satir in yeni.itertuples(index=False):
+            veri["gecmis"][satir.Tarih.strftime("%Y-%m-%d")] = {k: float(getattr(satir, k)) for k in KURLAR}
+        en_son = yeni.sort_values("Tarih").iloc[-1]
+        veri["son"] = {**{k: float(en_son[k]) for k in KURLAR}, "zaman": time.time()}
+        self._kaydet(veri)
+        self._veri = veri
+        self._gecmis = None
+
+    def gecmis(self):
+        """Günlük kurlar: Tarih (datetime64) + KURLAR kolonları, tarihe göre sıralı."""
+        if self._gecmis is None:
+            kayit = self._veri["gecmis"]
+            df = pd.DataFrame.from_dict(kayit, orient="index", columns=KURLAR) if kayit else pd.DataFrame(columns=KURLAR, dtype=float)
+            df.index = pd.to_datetime(df.index)
+            self._gecmis = df.rename_axis("Tarih").reset_index().sort_values("Tarih", ignore_index=True)
+        return self._gecmis
+
+    def guncellenme(self):
+        zaman = self._veri["son"].get("zaman")
+        return datetime.fromtimestamp(zaman) if zaman else None
+
+# --- ÇEVİRİ ---
+def kur_cevir(df, gecmis, kur):
+    """
+    Tutar'ı işlem tarihindeki kurla kur birimine çevirir (TL / kur).
+    Kurlar merge_asof ile tek seferde eşlenir: işlem gününe en yakın önceki
+    kur kullanılır. Geçmişten eski işlemler yanlış kurla çevrilmez, Tutar'ları
+    NaN kalır (toplamlara girmez). Geçmiş boşsa None.
+    """
+    gecmis = gecmis[["Tarih", kur]].dropna()
+    if gecmis.empty: return None
+    sol = pd.DataFrame({"Tarih": df["Tarih"].astype("datetime64[ns]").to_numpy(), "Sira": range(len(df))}).sort_values("Tarih")
+    sag = gecmis.assign(Tarih=gecmis["Tarih"].astype("datetime64[ns]"))
+    eslesen = pd.merge_asof(sol, sag, on="Tarih", direction="backward").sort_values("Sira")
+    return df.assign(Tutar=df["Tutar"].to_numpy(dtype=float) / eslesen[kur].to_numpy())
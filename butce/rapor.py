@@ -0,0 +1,38 @@
+import pandas as pd
+from .ozet import aylik_ozet, bos_ozet
+from .sema import normalize_et
+
+RAPOR_KOLONLARI = ["Gelir", "Gider", "Net", "Bekleyen", "Adet"]
+
+def donem_raporu(ozet, anahtar=("Yil", "Ay")):
+    """
+    Aylık özetten dönem başına Gelir, Gider, Net, Bekleyen (ödenmemiş gider)
+    ve kayıt sayısı. anahtar ("Yil",) verilirse yıllık rapor olur.
+    """
+    anahtar = list(anahtar)
+    if ozet.empty: return pd.DataFrame(columns=anahtar + RAPOR_KOLONLARI)
+    gelir = ozet["Tür"] == "Gelir"
+    gider = ozet["Tür"] == "Gider"
+    tablo = ozet[anahtar].assign(
+        Gelir=ozet["Tutar"].where(gelir, 0.0), Gider=ozet["Tutar"].where(gider, 0.0),
+        Bekleyen=ozet["Tutar"].where(gider & ~ozet["Durum"].astype(bool), 0.0), Adet=ozet["Adet"],
+    )
+    rapor = tablo.groupby(anahtar, sort=True).sum().reset_index()
+    rapor["Net"] = rapor["Gelir"] - rapor["Gider"]
+    rapor[RAPOR_KOLONLARI[:-1]] = rapor[RAPOR_KOLONLARI[:-1]].round(2)
+    return rapor[anahtar + RAPOR_KOLONLARI]
+
+def kategori_raporu(ozet):
+    """Ay ve kategori başına toplam tutar ve kayıt sayısı."""
+    if ozet.empty: return pd.DataFrame(columns=["Yil", "Ay", "Tür", "Kategori", "Tutar", "Adet"])
+    rapor = ozet.groupby(["Yil", "Ay", "Tür", "Kategori"], sort=True)[["Tutar", "Adet"]].sum().reset_index()
+    return rapor.assign(Tutar=rapor["Tutar"].round(2))
+
+def raporlar(ozet):
+    """Tek özetten üretilen tüm raporlar: {"aylik", "yillik", "kategoriler"}."""
+    return {"aylik": donem_raporu(ozet), "yillik": donem_raporu(ozet, ("Yil",)), "kategoriler": kategori_raporu(ozet)}
+
+def csv_ozeti(yol):
+    """Uygulamadan indirilen yedek CSV'nin aylık özeti."""
+    df = normalize_et(pd.read_csv(yol))
+    return aylik_ozet(df) if not df.empty else bos_ozet()
@@ -0,0 +1,55 @@
+import time
+import pandas as pd
+
+# --- DEFTER ŞEMASI ---
+# Tarih, Son Ödeme Tarihi: datetime64 · Kategori, Tür: category · Tutar: float64 · Durum: bool · Açıklama, ID: metin
+KOLONLAR = ["Tarih", "Kategori", "Tür", "Tutar", "Son Ödeme Tarihi", "Açıklama", "Durum", "ID"]
+KATEGORIK_KOLONLAR = ["Kategori", "Tür"]
+
+def bellek(df):
+    return int(df.memory_usage(deep=True).sum())
+
+def durum_cevir(seri):
+    if seri.dtype == bool: return seri
+    return seri.astype(str).str.lower().map({'true': True, 'false': False, '1.0': True, '0.0': False, '1': True, '0': False, 'nan': False}).fillna(False).astype(bool)
+
+def normalize_et(df, rapor=None):
+    """
+    Ham defteri (sayfa/SQLite/form satırları) şema tiplerine çevirir; Tarih'i
+    geçersiz satırlar atılır. Veri sürümü başına bir kez çağrılır, sonraki
+    tüm adımlar bu tipli tabloyu kullanır. rapor sözlüğü verilirse önceki ve
+    sonraki bellek kullanımı (bayt) ile süre (ms) yazılır.
+    """
+    bas = time.perf_counter()
+    if rapor is not None: rapor["once"] = bellek(df)
+    df = df.reindex(columns=KOLONLAR)
+    tarih = pd.to_datetime(df["Tarih"], errors='coerce')
+    tipli = pd.DataFrame({
+        "Tarih": tarih,
+        "Kategori": df["Kategori"].astype("category"),
+        "Tür": df["Tür"].astype("category"),
+        "Tutar": pd.to_numeric(df["Tutar"], errors='coerce').fillna(0.0).astype("float64"),
+        "Son Ödeme Tarihi": pd.to_datetime(df["Son Ödeme Tarihi"], errors='coerce'),
+        "Açıklama": df["Açıklama"],
+        "Durum": durum_cevir(df["Durum"]),
+        "ID": df["ID"],
+    }, index=df.index)
+    tipli = tipli[tarih.notna()].reset_index(drop=True)
+    if rapor is not None: rapor.update(sonra=bellek(tipli), ms=round((time.perf_counter() - bas) * 1000, 3))
+    return tipli
+
+def bos_defter(): return normalize_et(pd.DataFrame(columns=KOLONLAR))
+
+def birlestir(*parcalar):
+    """Tipli defter parçalarını uç uca ekler; farklı kategorili kolonlar yeniden kategorik yapılır."""
+    df = pd.concat(parcalar, ignore_index=True)
+    for col in KATEGORIK_KOLONLAR:
+        if not isinstance(df[col].dtype, pd.CategoricalDtype): df[col] = df[col].astype("category")
+    return df
+
+def kategorileri_genislet(hedef, kaynak):
+    """kaynak'taki yeni kategori değerlerini hedef'in kategorilerine ekler (yerinde atamadan önce)."""
+    for col in KATEGORIK_KOLONLAR:
+        yeni = pd.Index(kaynak[col].dropna().unique()).difference(hedef[col].cat.categories)
+        if len(yeni): hedef[col] = hedef[col].cat.add_categories(yeni)
+    return hedef
@@ -0,0 +1,46 @@
+from datetime import datetime, date
+import pandas as pd
+
+AYLAR = ["Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran", "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık"]
+
+def guvenli_int(deger):
+    try:
+        if pd.isna(deger) or str(deger).strip() == "": return 0
+        return int(float(deger))
+    except: return 0
+
+def tarih_olustur(yil, ay_ismi, gun):
+    try: 
+        ay_index = AYLAR.index(ay_ismi) + 1
+        yil = int(yil)
+    except: 
+        ay_index = datetime.now().month
+        yil = datetime.now().year
+    
+    h_gun = guvenli_int(gun)
+    if h_gun <= 0: h_gun = 1
+    
+    try: return date(yil, ay_index, h_gun)
+    except ValueError: return date(yil, ay_index, 28)
+
+def son_odeme_hesapla(islem_tarihi, varsayilan_gun):
+    """
+    Kategorinin varsayılan ödeme gününe göre SONRAKİ ayın tarihini hesaplar.
+    Örn: İşlem Tarihi: 10 Ocak, Varsayılan Gün: 5 -> Sonuç: 5 Şubat
+    """
+    v_gun = guvenli_int(varsayilan_gun)
+    if v_gun == 0: return islem_tarihi
+    
+    # Bir sonraki ayı bul
+    next_month = islem_tarihi.month + 1
+    next_year = islem_tarihi.year
+    
+    if next_month > 12:
+        next_month = 1
+        next_year += 1
+        
+    try:
+        return date(next_year, next_month, v_gun)
+    except ValueError:
+        # Şubat 30 gibi olmayan tarihler için ayın 28'ini döndür
+        return date(next_year, next_month, 28)
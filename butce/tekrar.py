@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+ANAHTAR = ["Yil", "Ay", "Kategori", "Tutar", "Açıklama"]
+
+def guvenli_int_seri(seri):
+    """guvenli_int'in kolon hali: sayıya çevrilemeyen değerler 0, ondalıklar sıfıra doğru kesilir."""
+    sayi = pd.to_numeric(seri, errors="coerce").replace([np.inf, -np.inf], np.nan).fillna(0)
+    return np.trunc(sayi).astype(int)
+
+def gunlu_tarih(yil, ay, gun):
+    """Yıl/ay/gün kolonlarından tarih üretir; ayda olmayan günler (Şubat 30, -3...) ayın 28'ine çekilir."""
+    ay_basi = pd.to_datetime(pd.DataFrame({"year": yil, "month": ay, "day": 1}))
+    gun = gun.where((gun >= 1) & (gun <= ay_basi.dt.days_in_month), 28)
+    return ay_basi + pd.to_timedelta(gun - 1, unit="D")
+
+def sonraki_ay(yil, ay):
+    # Aralık -> ertesi yılın Ocak'ı
+    return yil + (ay == 12), ay % 12 + 1
+
+def tarihleri_olustur(yil, ay, varsayilan_gun):
+    """tarih_olustur'un kolon hali: gün <= 0 ise ayın 1'i."""
+    return gunlu_tarih(yil, ay, varsayilan_gun.where(varsayilan_gun > 0, 1))
+
+def son_odemeleri_hesapla(tarih, varsayilan_gun):
+    """son_odeme_hesapla'nın kolon hali: gün 0 ise işlem tarihi, değilse sonraki ayın o günü."""
+    yil, ay = sonraki_ay(tarih.dt.year, tarih.dt.month)
+    return gunlu_tarih(yil, ay, varsayilan_gun).where(varsayilan_gun != 0, tarih)
+
+def _sirali_anahtar(df):
+    # Aynı anahtarlı satırları sıra numarasıyla ayırır; böylece iki eş kayıttan biri kopyalanmışsa diğeri yine kopyalanır
+    df = df.assign(Yil=df["Tarih"].dt.year, Ay=df["Tarih"].dt.month, Açıklama=df["Açıklama"].fillna("").astype(str))
+    return df.assign(Sira=df.groupby(ANAHTAR, sort=False, observed=True).cumcount())
+
+def sabit_giderleri_kopyala(kaynak, df_kat, yil, ay, ay_sayisi=1, mevcut=None):
+    """
+    kaynak aydaki giderleri (yil, ay) ile başlayan ay_sayisi aya kopyalar.
+    Kategoriyle tek seferde birleştirilir, tarihler kolon kolon hesaplanır.
+    mevcut (hedef aylardaki kayıtlar) verilirse daha önce kopyalanmış satırlar atlanır.
+    Döner: (yeni satırlar, atlanan satır sayısı)
+    """
+    giderler = kaynak.loc[kaynak["Tür"] == "Gider", ["Kategori", "Tutar", "Açıklama"]]
+    gunler = df_kat.drop_duplicates("Kategori")[["Kategori", "VarsayilanGun"]]
+    sablon = giderler.merge(gunler, on="Kategori", how="inner")
+    if sablon.empty: return pd.DataFrame(columns=list(kaynak.columns)), 0
+
+    adim = np.arange(ay_sayisi)
+    aylar = pd.DataFrame({"HedefYil": yil + (ay - 1 + adim) // 12, "HedefAy": (ay - 1 + adim) % 12 + 1})
+    sablon = sablon.merge(aylar, how="cross")
+    vg = guvenli_int_seri(sablon["VarsayilanGun"])
+    tarih = tarihleri_olustur(sablon["HedefYil"], sablon["HedefAy"], vg)
+    kopya = pd.DataFrame({
+        "Tarih": tarih, "Kategori": sablon["Kategori"], "Tür": "Gider",
+        "Tutar": sablon["Tutar"].astype(float), "Son Ödeme Tarihi": son_odemeleri_hesapla(tarih, vg),
+        "Açıklama": sablon["Açıklama"].fillna("").astype(str) + " (Kopya)", "Durum": False,
+    })
+
+    if mevcut is None or mevcut.empty: return kopya, 0
+    var = _sirali_anahtar(mevcut[mevcut["Tür"] == "Gider"])[ANAHTAR + ["Sira"]]
+    eslesme = _sirali_anahtar(kopya).merge(var, on=ANAHTAR + ["Sira"], how="left", indicator=True)["_merge"].to_numpy()
+    yeni = kopya[eslesme == "left_only"].reset_index(drop=True)
+    return yeni, len(kopya) - len(yeni)
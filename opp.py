@@ -1,9 +1,21 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from datetime import datetime, date, timedelta
+from datetime import date, datetime
 import time
-import re
+from butce.depo import depo_olustur, varsayilan_kategoriler
+from butce.sema import birlestir, bos_defter
+from butce.onbellek import OnbellekliDepo
+from butce.kuyruk import YazmaKuyrugu
+from butce.analiz import etiketleri_analiz_et
+from butce.tekrar import sabit_giderleri_kopyala
+from butce.ice_aktar import ekstre_oku, kurallari_coz
+from butce.disa_aktar import BICIMLER, aralik_filtrele, disa_aktar, dosya_adi, kullanilabilir_bicimler
+from butce.arama import AramaIndeksi
+from butce.piyasa import KurDeposu, kaynak_olustur, kur_cevir
+from butce.olcum import olcum_baslat
+from butce.degisiklik import bekleyen_var, degisiklikleri_cikar, farkli_satirlar
+from butce.ozet import aylik_ozet, bos_ozet, ozet_birlestir, gider_dagilimi, aylik_trend, ozet_filtrele, ozet_kpi
+from butce.tarih import AYLAR, guvenli_int, tarih_olustur, son_odeme_hesapla
 
 # --- 1. AYARLAR ---
 st.set_page_config(page_title="Bütçe v56", page_icon="🐦", layout="wide")
@@ -78,127 +90,93 @@ RENK_GELIR = "#28a745"
 RENK_GIDER = "#dc3545"
 RENK_NET = "#007bff"
 RENK_ODENMEMIS = "#ffc107"
-KOLONLAR = ["Tarih", "Kategori", "Tür", "Tutar", "Son Ödeme Tarihi", "Açıklama", "Durum"]
-AYLAR = ["Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran", "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık"]
 
 # --- YARDIMCILAR ---
-def guvenli_int(deger):
-    try:
-        if pd.isna(deger) or str(deger).strip() == "": return 0
-        return int(float(deger))
-    except: return 0
-
 def get_connection():
     from streamlit_gsheets import GSheetsConnection
     return st.connection("gsheets", type=GSheetsConnection)
 
-@st.cache_data(ttl=3600) 
-def piyasa_verileri_getir():
-    try:
-        import yfinance as yf
-        tickers = yf.download("TRY=X EURTRY=X GC=F", period="1d", progress=False)['Close']
-        dolar = tickers['TRY=X'].iloc[-1]
-        euro = tickers['EURTRY=X'].iloc[-1]
-        ons_altin = tickers['GC=F'].iloc[-1]
-        gram_altin = (ons_altin / 31.1035) * dolar
-        return dolar, euro, gram_altin
-    except: return 0, 0, 0
+@st.cache_resource
+def get_depo():
+    # Süreç boyunca tek önbellekli depo; tüm oturumlar aynı tabloları paylaşır
+    return OnbellekliDepo(depo_olustur(st.secrets.get("depo"), get_connection))
+
+@st.cache_resource
+def get_kuyruk():
+    # Formdan girilen satırlar burada bekler ve topluca yazılır; tüm oturumlar aynı kuyruğu paylaşır
+    return YazmaKuyrugu(get_depo())
+
+@st.cache_resource
+def get_piyasa():
+    # Kurlar arka planda tazelenir; sayfa her zaman elde olan son değeri gösterir
+    ayar = dict(st.secrets.get("piyasa") or {})
+    return KurDeposu(kaynak_olustur(ayar), ayar.get("depo", "piyasa.json"))
 
 # --- VERİ İŞLEMLERİ ---
-def verileri_cek(conn):
-    try:
-        df = conn.read(worksheet="Veriler", ttl=0)
-        if df.empty or "Tarih" not in df.columns: return pd.DataFrame(columns=KOLONLAR)
-        df = df.dropna(how="all")
-        for col in KOLONLAR:
-            if col not in df.columns: df[col] = pd.NA
-        return df
-    except: return pd.DataFrame(columns=KOLONLAR)
-
-def kategorileri_cek(conn):
-    varsayilan = pd.DataFrame([{"Kategori": "Maaş", "Tur": "Gelir", "VarsayilanGun": 1}, {"Kategori": "Market", "Tur": "Gider", "VarsayilanGun": 0}])
-    try:
-        df = conn.read(worksheet="Kategoriler", ttl=0)
-        if df.empty: conn.update(worksheet="Kategoriler", data=varsayilan); return varsayilan
-        if "Kategori" not in df.columns: return varsayilan
-        return df.dropna(how="all")
-    except: return varsayilan
+def verileri_cek(depo, yil=None, ay=None):
+    try: return depo.read_ledger(yil, ay)
+    except: return bos_defter()
+
+def ozet_cek(depo):
+    try: return depo.aylik_ozet()
+    except: return bos_ozet()
 
-def verileri_kaydet(conn, df):
+def kategorileri_cek(depo):
+    try: return depo.read_categories()
+    except: return varsayilan_kategoriler()
+
+def degisiklikleri_kaydet(depo, guncel, eklenen, silinen):
+    # Yalnızca değişen satırlar gönderilir; tüm sayfa yeniden yazılmaz
     try:
-        save_df = df.copy()
-        # Tarih formatlama
-        save_df["Tarih"] = pd.to_datetime(save_df["Tarih"], errors='coerce')
-        save_df["Tarih"] = save_df["Tarih"].dt.strftime('%Y-%m-%d').fillna("")
-        
-        save_df["Son Ödeme Tarihi"] = pd.to_datetime(save_df["Son Ödeme Tarihi"], errors='coerce')
-        save_df["Son Ödeme Tarihi"] = save_df["Son Ödeme Tarihi"].dt.strftime('%Y-%m-%d').fillna("")
-        
-        save_df["Tutar"] = pd.to_numeric(save_df["Tutar"], errors='coerce').fillna(0.0)
-        save_df = save_df.fillna("") 
-        
-        for col in KOLONLAR:
-            if col not in save_df.columns: save_df[col] = ""
-        conn.update(worksheet="Veriler", data=save_df[KOLONLAR])
+        if not guncel.empty: depo.update_rows(guncel)
+        if not eklenen.empty: depo.append_rows(eklenen)
+        if silinen: depo.delete_rows(silinen)
+        return True
     except Exception as e:
-        st.error(f"Kayıt Hatası: {e}")
+        st.error(f"Kayıt Hatası: {e}"); return False
 
-def kategorileri_kaydet(conn, df): conn.update(worksheet="Kategoriler", data=df)
+def bekleyenlerle(df, kuyruk, yil=None, ay=None):
+    # Kuyruk boşken birleştirilmez: birlestir kategorik kolonları yeniden kurup defterin tam kopyasını çıkarır
+    bekleyen = kuyruk.bekleyenler(yil, ay)
+    return df if bekleyen.empty else birlestir(df, bekleyen)
 
-def tarih_olustur(yil, ay_ismi, gun):
-    try: 
-        ay_index = AYLAR.index(ay_ismi) + 1
-        yil = int(yil)
-    except: 
-        ay_index = datetime.now().month
-        yil = datetime.now().year
-    
-    h_gun = guvenli_int(gun)
-    if h_gun <= 0: h_gun = 1
-    
-    try: return date(yil, ay_index, h_gun)
-    except ValueError: return date(yil, ay_index, 28)
-
-def son_odeme_hesapla(islem_tarihi, varsayilan_gun):
-    """
-    Kategorinin varsayılan ödeme gününe göre SONRAKİ ayın tarihini hesaplar.
-    Örn: İşlem Tarihi: 10 Ocak, Varsayılan Gün: 5 -> Sonuç: 5 Şubat
-    """
-    v_gun = guvenli_int(varsayilan_gun)
-    if v_gun == 0: return islem_tarihi
-    
-    # Bir sonraki ayı bul
-    next_month = islem_tarihi.month + 1
-    next_year = islem_tarihi.year
-    
-    if next_month > 12:
-        next_month = 1
-        next_year += 1
-        
-    try:
-        return date(next_year, next_month, v_gun)
-    except ValueError:
-        # Şubat 30 gibi olmayan tarihler için ayın 28'ini döndür
-        return date(next_year, next_month, 28)
-
-def csv_indir(df): return df.to_csv(index=False).encode('utf-8')
-
-def etiketleri_analiz_et(df):
-    etiket_verisi = []
-    for _, row in df.iterrows():
-        aciklama = str(row["Açıklama"]).lower()
-        bulunanlar = re.findall(r"#(\w+)", aciklama)
-        if bulunanlar:
-            bolunmus_tutar = row["Tutar"] / len(bulunanlar)
-            for etiket in bulunanlar: etiket_verisi.append({"Etiket": etiket, "Tutar": bolunmus_tutar})
-    if etiket_verisi: return pd.DataFrame(etiket_verisi).groupby("Etiket")["Tutar"].sum().reset_index().sort_values("Tutar", ascending=False)
-    else: return pd.DataFrame()
+def satirlari_ekle(depo, df):
+    try: depo.append_rows(df); return True
+    except Exception as e:
+        st.error(f"Kayıt Hatası: {e}"); return False
+
+def kuyrugu_bosalt(kuyruk):
+    try: kuyruk.bosalt(); return True
+    except Exception as e:
+        st.error(f"Kayıt Hatası: {e}"); return False
+
+def kategorileri_kaydet(depo, df): depo.write_categories(df)
+
+@st.cache_resource(max_entries=2)
+def arama_indeksi(surum, _df):
+    # Veri sürümü başına bir kez kurulur; tuş vuruşlarındaki yeniden çalıştırmalar hazır indeksi kullanır
+    return AramaIndeksi(_df)
+
+def okuma_notu(a, depo, iska):
+    # Önbellek ıskasında depo okuması ve normalizasyon bu aşamada yapılmıştır
+    a["onbellek"] = "ıska" if depo.sayac["iska"] > iska else "isabet"
+    if a["onbellek"] == "ıska": a.update(normalize_ms=depo.bellek_raporu.get("ms"), bayt=depo.bellek_raporu.get("once"))
+
+@st.cache_resource(max_entries=4)
+def disa_aktarim(anahtar, bicim, _df_getir):
+    # Aynı veri sürümü, kapsam ve biçim için dosya bir kez hazırlanır; anahtar (sürüm, kuyruk, kapsam) içerir.
+    # Dönen BytesIO oturumlarca paylaşılır, yalnızca okunur: download_button her indirmede başa sarıp okur
+    return disa_aktar(_df_getir(), bicim)
 
 # ==========================================
 # --- UYGULAMA AKIŞI ---
 # ==========================================
 
 if "giris_yapildi" not in st.session_state: st.session_state.giris_yapildi = False
+if "liste_no" not in st.session_state: st.session_state.liste_no = 0
+# Gizli ölçüm paneli: secrets.toml'da [olcum] panel = true
+olcum_ayar = dict(st.secrets.get("olcum") or {})
+olcum, onceki_olcum = olcum_baslat(st.session_state, bool(olcum_ayar.get("panel")), olcum_ayar.get("gunluk", "olcum.jsonl"))
 if "genel" not in st.secrets: st.session_state.giris_yapildi = True
 
 # --- GİRİŞ ---
@@ -216,38 +194,38 @@ if not st.session_state.giris_yapildi:
 
 # --- ANA EKRAN ---
 else:
-    conn = get_connection()
-    df = verileri_cek(conn)
-    df_kat = kategorileri_cek(conn)
-
-    if not df.empty:
-        df["Tarih"] = pd.to_datetime(df["Tarih"], errors='coerce')
-        df = df.dropna(subset=["Tarih"])
-        if "Durum" in df.columns:
-            df["Durum"] = df["Durum"].astype(str).str.lower().map({'true': True, 'false': False, '1.0': True, '0.0': False, '1': True, '0': False, 'nan': False}).fillna(False)
-        else: df["Durum"] = False
-        if "Tutar" in df.columns: df["Tutar"] = pd.to_numeric(df["Tutar"], errors='coerce').fillna(0.0)
-        else: df["Tutar"] = 0.0
+    depo = get_depo()
+    kuyruk = get_kuyruk()
+    # Formdan ayrılınca (KAYDET dışındaki her etkileşimde) bekleyen satırlar boşta kalma süresi beklenmeden yazılır;
+    # kota hatasında yeniden deneme arka planda beklemeli yapılır
+    formdan = st.session_state.pop("kuyruk_formdan", False) or st.session_state.get("kaydet_btn", False)
+    if kuyruk.bekleyen and not formdan:
+        try:
+            with olcum.asama("kayit:kuyruk", satir=kuyruk.bekleyen): kuyruk.bosalt(deneme=1)
+        except: kuyruk.arkada_bosalt()
+    with olcum.asama("kategoriler") as a: df_kat = kategorileri_cek(depo); a["satir"] = len(df_kat)
 
     # 1. ÜST BAR
     c_top_l, c_top_r = st.columns([0.65, 0.35])
-    usd, eur, gram = piyasa_verileri_getir()
+    piyasa = get_piyasa()
+    with olcum.asama("piyasa"): kur = piyasa.son()
     
     with c_top_l:
-        if usd > 0:
+        if kur:
             st.markdown(f"""
-            <div class="market-box">
-                <span>💵 {usd:.2f}</span>
-                <span>💶 {eur:.2f}</span>
-                <span>🥇 {gram:.0f}</span>
+            <div class="market-box" title="{piyasa.guncellenme():%d.%m.%Y %H:%M}">
+                <span>💵 {kur['USD']:.2f}</span>
+                <span>💶 {kur['EUR']:.2f}</span>
+                <span>🥇 {kur['GRAM']:.0f}</span>
             </div>""", unsafe_allow_html=True)
         else: st.caption("Yükleniyor...")
+        if kuyruk.bekleyen: st.caption(f"⏳ {kuyruk.bekleyen} kaydedilmemiş kayıt" + (" · kota doldu, yeniden denenecek" if kuyruk.hata else ""))
 
     with c_top_r:
         b1, b2 = st.columns(2)
         with b1: 
             st.markdown('<div class="top-btn-container">', unsafe_allow_html=True)
-            if st.button("🔄 Yenile", use_container_width=True): st.cache_data.clear(); st.rerun()
+            if st.button("🔄 Yenile", use_container_width=True): depo.yenile(); st.session_state.liste_no += 1; st.rerun()
             st.markdown('</div>', unsafe_allow_html=True)
         with b2: 
             st.markdown('<div class="top-btn-container logout-btn">', unsafe_allow_html=True)
@@ -264,16 +242,16 @@ else:
     
     if arama_modu:
         with c_yil: st.write("")
-        with c_ay: kelime = st.text_input("Ara", label_visibility="collapsed", placeholder="Ara...")
+        with c_ay: kelime = st.text_input("Ara", label_visibility="collapsed", placeholder="Ara... (#etiket, kategori:market, tutar>500)")
+        with olcum.asama("okuma") as a:
+            iska = depo.sayac["iska"]; df = bekleyenlerle(verileri_cek(depo), kuyruk); okuma_notu(a, depo, iska); a["satir"] = len(df)
         if kelime:
-            mask = df.astype(str).apply(lambda x: x.str.contains(kelime, case=False)).any(axis=1)
-            df_filt = df[mask]
+            with olcum.asama("arama") as a: df_filt = df[arama_indeksi((depo.surum, depo.tazeleme, kuyruk.degisim), df).ara(kelime)]; a["satir"] = len(df_filt)
             secilen_yil = "Arama"; secilen_ay = "Arama"
         else: df_filt = df; secilen_yil = "Arama"; secilen_ay = "Arama"
     else:
         kelime = None
-        try:
-            yil_list = sorted(df["Tarih"].dt.year.dropna().astype(int).unique(), reverse=True)
+        try: yil_list = depo.years()
         except: yil_list = []
             
         current_year = datetime.now().year
@@ -284,44 +262,52 @@ else:
             idx = datetime.now().month if secilen_yil == current_year else 0
             secilen_ay = st.selectbox("Ay", ["Tüm"] + AYLAR, index=idx, label_visibility="collapsed")
         
-        if secilen_yil == "Tüm": df_filt = df
-        else:
-            df_filt = df[df["Tarih"].dt.year == secilen_yil]
-            if secilen_ay != "Tüm":
-                ay_no = AYLAR.index(secilen_ay) + 1
-                df_filt = df_filt[df_filt["Tarih"].dt.month == ay_no]
+        # Yıl/ay filtresi depoya iner (SQLite'ta Tarih indeksiyle aralık sorgusu)
+        f_yil = None if secilen_yil == "Tüm" else int(secilen_yil)
+        f_ay = None if f_yil is None or secilen_ay == "Tüm" else AYLAR.index(secilen_ay) + 1
+        with olcum.asama("okuma") as a:
+            # Kuyruktaki satırlar yazılmayı beklemeden gösterilir
+            iska = depo.sayac["iska"]; df_filt = bekleyenlerle(verileri_cek(depo, f_yil, f_ay), kuyruk, f_yil, f_ay); okuma_notu(a, depo, iska); a["satir"] = len(df_filt)
 
     # 3. KOPYALAMA ARAÇLARI
     if not arama_modu and secilen_ay != "Tüm" and secilen_yil != "Tüm":
         with st.expander("🛠️ Kopyala / İndir"):
             ec1, ec2 = st.columns(2)
-            with ec1: st.download_button("📥 Excel İndir", csv_indir(df), "yedek.csv", "text/csv", use_container_width=True)
+            # Dosya yalnızca butona basılınca hazırlanır ve veri sürümü değişene kadar önbellekten verilir
+            with ec1:
+                cikti_bicimi = st.selectbox("Biçim", kullanilabilir_bicimler(), label_visibility="collapsed")
+                kapsam = st.radio("Kapsam", ["Bu ay", "Tümü", "Aralık"], horizontal=True, label_visibility="collapsed")
+                if kapsam == "Aralık":
+                    aralik = st.date_input("Aralık", (date(f_yil, 1, 1), date(f_yil, 12, 31)), format="DD.MM.YYYY", label_visibility="collapsed")
+                    bas, bit = (aralik[0], aralik[-1]) if aralik else (date(f_yil, 1, 1), date(f_yil, 12, 31))
+                    # Aralığın kapsadığı yıllar okunur (yıllık depoda yalnızca o sayfalar)
+                    indir_getir = lambda bas=bas, bit=bit: aralik_filtrele(bekleyenlerle(birlestir(*[verileri_cek(depo, y) for y in range(bas.year, bit.year + 1)]), kuyruk), bas, bit)
+                    indir_anahtar, indir_adi = (bas, bit), f"butce_{bas:%Y%m%d}_{bit:%Y%m%d}"
+                elif kapsam == "Bu ay": indir_getir, indir_anahtar, indir_adi = lambda df=df_filt: df, (f_yil, f_ay), f"butce_{f_yil}_{f_ay:02d}"
+                else: indir_getir, indir_anahtar, indir_adi = lambda: bekleyenlerle(verileri_cek(depo), kuyruk), None, "yedek"
+                # Değerler şimdiden bağlanır: tıklamada betiğin sonraki atamaları görülmez
+                st.download_button(f"📥 {cikti_bicimi} İndir", lambda k=(depo.surum, depo.tazeleme, kuyruk.degisim, kapsam, indir_anahtar), b=cikti_bicimi, g=indir_getir: disa_aktarim(k, b, g),
+                                   dosya_adi(cikti_bicimi, indir_adi), BICIMLER[cikti_bicimi][1], use_container_width=True)
             with ec2:
-                if st.button("⏮️ Geçen Ayı Kopyala", use_container_width=True):
+                ay_say = st.number_input("Kaç ay", 1, 12, 1, help="Geçen ayın giderleri bu aydan başlayarak kaç aya kopyalansın")
+                if st.button("⏮️ Geçen Ayı Kopyala", use_container_width=True) and kuyrugu_bosalt(kuyruk):
                     try:
                         hy = int(secilen_yil)
                         ha = AYLAR.index(secilen_ay) + 1
                         if ha == 1: ka = 12; ky = hy - 1
                         else: ka = ha - 1; ky = hy
-                        kdf = df[(df["Tarih"].dt.year == ky) & (df["Tarih"].dt.month == ka) & (df["Tür"] == "Gider")]
+                        kdf = verileri_cek(depo, ky, ka)
+                        kdf = kdf[kdf["Tür"] == "Gider"]
                         
                         if not kdf.empty:
-                            kopya = []
-                            for _, r in kdf.iterrows():
-                                kb = df_kat[df_kat["Kategori"] == r["Kategori"]]
-                                if not kb.empty:
-                                    vg = guvenli_int(kb.iloc[0]["VarsayilanGun"])
-                                    yt = tarih_olustur(hy, secilen_ay, vg)
-                                    yso = son_odeme_hesapla(yt, vg)
-                                    kopya.append({
-                                        "Tarih": pd.to_datetime(yt), "Kategori": r["Kategori"], "Tür": "Gider", 
-                                        "Tutar": float(r["Tutar"]), "Son Ödeme Tarihi": yso, 
-                                        "Açıklama": f"{r['Açıklama']} (Kopya)", "Durum": False
-                                    })
-                            if kopya:
-                                yeni_df = pd.concat([df, pd.DataFrame(kopya)], ignore_index=True)
-                                verileri_kaydet(conn, yeni_df)
-                                st.success(f"{len(kopya)} Kayıt Kopyalandı!"); time.sleep(1); st.rerun()
+                            # Hedef aylardaki mevcut kayıtlar: butona iki kez basılınca aynı satırlar tekrar eklenmez
+                            mevcut = pd.concat([verileri_cek(depo, hy + (ha - 1 + i) // 12, (ha - 1 + i) % 12 + 1) for i in range(int(ay_say))], ignore_index=True)
+                            kopya, atlanan = sabit_giderleri_kopyala(kdf, df_kat, hy, ha, int(ay_say), mevcut)
+                            if not kopya.empty:
+                                with olcum.asama("kayit:kopya", satir=len(kopya)): kaydedildi = satirlari_ekle(depo, kopya)
+                                if kaydedildi:
+                                    st.success(f"{len(kopya)} Kayıt Kopyalandı!"); time.sleep(1); st.rerun()
+                            elif atlanan: st.warning("Bu aylar zaten kopyalanmış.")
                             else: st.warning("Sabit gider yok.")
                         else: st.error("Geçen ayda veri yok.")
                     except Exception as e: st.error(f"Hata: {e}")
@@ -329,11 +315,23 @@ else:
     st.write("")
 
     # 4. KARTLAR
-    if not df_filt.empty:
-        gelir = df_filt[df_filt["Tür"] == "Gelir"]["Tutar"].sum()
-        gider = df_filt[df_filt["Tür"] == "Gider"]["Tutar"].sum()
+    # Kartlar ve grafikler satırlardan değil aylık özetten beslenir; aramada eldeki satırların özeti kullanılır
+    with olcum.asama("ozet") as a:
+        ozet_tum = aylik_ozet(df_filt) if arama_modu else ozet_birlestir(ozet_cek(depo), eklenen=kuyruk.bekleyenler())
+        ozet_filt = ozet_tum if arama_modu else ozet_filtrele(ozet_tum, f_yil, f_ay); a["satir"] = len(ozet_filt)
+    if not ozet_filt.empty:
+        birim = st.radio("Birim", ["₺", "$", "gr"], horizontal=True, label_visibility="collapsed")
+        kpi = ozet_kpi(ozet_filt); bicim = ",.0f"
+        if birim != "₺":
+            # Her işlem kendi tarihindeki kurla çevrilir; kurlar diskteki geçmişten gelir
+            cevrilmis = kur_cevir(df_filt, piyasa.gecmis(), "USD" if birim == "$" else "GRAM")
+            if cevrilmis is None: st.caption("Kur geçmişi henüz yok, tutarlar ₺.")
+            else:
+                kursuz = int(cevrilmis["Tutar"].isna().sum())
+                kpi = ozet_kpi(aylik_ozet(cevrilmis.dropna(subset=["Tutar"]))); bicim = ",.0f" if birim == "$" else ",.1f"
+                if kursuz: st.caption(f"{kursuz} işlem kur geçmişinden eski, toplama katılmadı.")
+        gelir, gider, bekleyen = kpi["gelir"], kpi["gider"], kpi["bekleyen"]
         net = gelir - gider
-        bekleyen = df_filt[(df_filt["Tür"]=="Gider") & (df_filt["Durum"]==False)]["Tutar"].sum()
         
         ik = "😐"; cr = RENK_NET
         if net > 0: ik = "😃"; cr = RENK_GELIR
@@ -343,19 +341,19 @@ else:
         <div class="kpi-grid">
             <div class="kpi-card" style="border-top: 4px solid {RENK_GELIR};">
                 <div class="kpi-title">GELİR</div>
-                <div class="kpi-value" style="color:{RENK_GELIR}">💰 {gelir:,.0f}</div>
+                <div class="kpi-value" style="color:{RENK_GELIR}">💰 {gelir:{bicim}}</div>
             </div>
             <div class="kpi-card" style="border-top: 4px solid {RENK_GIDER};">
                 <div class="kpi-title">GİDER</div>
-                <div class="kpi-value" style="color:{RENK_GIDER}">💸 {gider:,.0f}</div>
+                <div class="kpi-value" style="color:{RENK_GIDER}">💸 {gider:{bicim}}</div>
             </div>
             <div class="kpi-card" style="border-top: 4px solid {cr};">
                 <div class="kpi-title">NET</div>
-                <div class="kpi-value" style="color:{cr}">{ik} {net:,.0f}</div>
+                <div class="kpi-value" style="color:{cr}">{ik} {net:{bicim}}</div>
             </div>
             <div class="kpi-card" style="border-top: 4px solid {RENK_ODENMEMIS};">
                 <div class="kpi-title">ÖDENMEMİŞ</div>
-                <div class="kpi-value" style="color:{RENK_ODENMEMIS}">⏳ {bekleyen:,.0f}</div>
+                <div class="kpi-value" style="color:{RENK_ODENMEMIS}">⏳ {bekleyen:{bicim}}</div>
             </div>
         </div>""", unsafe_allow_html=True)
     else: st.info("Kayıt yok.")
@@ -365,7 +363,7 @@ else:
     # 5. SEKMELER
     t1, t2, t3, t4 = st.tabs(["📝 Ekle", "📊 Grafik", "📋 Liste", "📂 Ayar"])
 
-    with t1:
+    with t1, olcum.asama("sekme:Ekle"):
         if arama_modu: st.warning("Aramayı kapatın")
         else:
             with st.form("giris_formu_main", clear_on_submit=True):
@@ -380,7 +378,7 @@ else:
                 
                 ac = st.text_input("Not", placeholder="#etiket (Opsiyonel)")
                 
-                submitted = st.form_submit_button("KAYDET")
+                submitted = st.form_submit_button("KAYDET", key="kaydet_btn")
                 
                 if submitted:
                     if secilen_yil == "Tüm" or secilen_ay == "Tüm": 
@@ -393,35 +391,60 @@ else:
                         kt = tarih_olustur(secilen_yil, secilen_ay, vg)
                         yso = son_odeme_hesapla(kt, vg) # Otomatik Sonraki Ay
                         yeni = pd.DataFrame([{"Tarih": pd.to_datetime(kt), "Kategori": ks, "Tür": ts, "Tutar": float(tug), "Son Ödeme Tarihi": yso, "Açıklama": ac, "Durum": False}])
-                        verileri_kaydet(conn, pd.concat([df, yeni], ignore_index=True))
-                        st.toast("✅ Kaydedildi!"); time.sleep(0.5); st.rerun()
+                        # Satır kuyruğa alınır; art arda girilen fişler boşta kalınca tek yazmada gönderilir
+                        with olcum.asama("kuyruk:ekle", satir=1): kuyruk.ekle(yeni)
+                        st.session_state.kuyruk_formdan = True
+                        st.toast("✅ Eklendi"); st.rerun()
                     else: st.warning("Tutar ve Kategori zorunludur.")
 
-    with t2:
-        if not df_filt.empty and "Gider" in df_filt["Tür"].values:
-            sg = df_filt[df_filt["Tür"]=="Gider"].copy()
-            sg["D"] = sg["Durum"].map({True:"Ödendi", False:"Bekliyor"})
+    with t2, olcum.asama("sekme:Grafik"):
+        trend = aylik_trend(ozet_tum)
+        # plotly yalnızca çizilecek grafik varsa yüklenir
+        if "Gider" in ozet_filt["Tür"].values or trend["Donem"].nunique() > 1: import plotly.express as px
+        if "Gider" in ozet_filt["Tür"].values:
+            dd = gider_dagilimi(ozet_filt, "Durum")
+            dd["D"] = dd["Durum"].map({True:"Ödendi", False:"Bekliyor"})
             c_g1, c_g2 = st.columns(2)
-            with c_g1: st.caption("Durum"); st.plotly_chart(px.pie(sg, values="Tutar", names="D", hole=0.5, color="D", color_discrete_map={"Ödendi":RENK_GELIR, "Bekliyor":RENK_GIDER}).update_layout(margin=dict(t=0,b=0,l=0,r=0), height=180, showlegend=False), use_container_width=True)
-            with c_g2: st.caption("Kategori"); st.plotly_chart(px.pie(sg, values="Tutar", names="Kategori", hole=0.5).update_layout(margin=dict(t=0,b=0,l=0,r=0), height=180, showlegend=False), use_container_width=True)
-            edf = etiketleri_analiz_et(sg)
+            with c_g1: st.caption("Durum"); st.plotly_chart(px.pie(dd, values="Tutar", names="D", hole=0.5, color="D", color_discrete_map={"Ödendi":RENK_GELIR, "Bekliyor":RENK_GIDER}).update_layout(margin=dict(t=0,b=0,l=0,r=0), height=180, showlegend=False), use_container_width=True)
+            with c_g2: st.caption("Kategori"); st.plotly_chart(px.pie(gider_dagilimi(ozet_filt, "Kategori"), values="Tutar", names="Kategori", hole=0.5).update_layout(margin=dict(t=0,b=0,l=0,r=0), height=180, showlegend=False), use_container_width=True)
+            edf = etiketleri_analiz_et(df_filt[df_filt["Tür"]=="Gider"])
             if not edf.empty: st.caption("Etiketler"); st.plotly_chart(px.bar(edf, x="Etiket", y="Tutar").update_layout(height=200, showlegend=False), use_container_width=True)
         else: st.info("Gider verisi yok.")
+        if trend["Donem"].nunique() > 1:
+            st.caption("Aylık Gelir / Gider")
+            st.plotly_chart(px.line(trend, x="Donem", y="Tutar", color="Tür", markers=True, color_discrete_map={"Gelir":RENK_GELIR, "Gider":RENK_GIDER}).update_layout(margin=dict(t=0,b=0,l=0,r=0), height=220, showlegend=False, xaxis_title=None, yaxis_title=None), use_container_width=True)
 
-    with t3:
+    with t3, olcum.asama("sekme:Liste"):
         if not df_filt.empty:
-            edt = df_filt.sort_values("Tarih", ascending=False).copy()
-            edt["Tarih"] = edt["Tarih"].dt.date
-            if "Son Ödeme Tarihi" in edt.columns: edt["Son Ödeme Tarihi"] = pd.to_datetime(edt["Son Ödeme Tarihi"], errors='coerce').dt.date
-            if arama_modu: st.dataframe(edt, hide_index=True, use_container_width=True)
+            # Defter zaten tipli: yalnızca görünen dilim editörün beklediği biçime çevrilir
+            edt = df_filt.sort_values("Tarih", ascending=False)
+            edt = edt.assign(**{"Tarih": edt["Tarih"].dt.date, "Son Ödeme Tarihi": edt["Son Ödeme Tarihi"].dt.date, "Kategori": edt["Kategori"].astype(object), "Tür": edt["Tür"].astype(object)})
+            if arama_modu: st.dataframe(edt, column_config={"ID": None}, hide_index=True, use_container_width=True)
             else:
-                duz = st.data_editor(edt, column_config={"Durum": st.column_config.CheckboxColumn(default=False), "Tutar": st.column_config.NumberColumn(format="%.0f"), "Kategori": st.column_config.SelectboxColumn(options=df_kat["Kategori"].unique().tolist()), "Tür": st.column_config.SelectboxColumn(options=["Gider", "Gelir"])}, hide_index=True, use_container_width=True, num_rows="dynamic")
-                if st.button("💾 Tabloyu Kaydet", use_container_width=True):
-                    dfr = df.drop(df_filt.index); duz["Tarih"] = pd.to_datetime(duz["Tarih"])
-                    verileri_kaydet(conn, pd.concat([dfr, duz], ignore_index=True)); st.success("Güncellendi."); st.rerun()
+                # Düzenleme sürerken editör ilk gösterilen tabloda tutulur; satır konumları ve çakışma kontrolü bu tabana göre yapılır
+                anahtar = f"liste_{secilen_yil}_{secilen_ay}_{st.session_state.liste_no}"
+                taban = st.session_state.get("liste_taban")
+                if taban is None or taban[0] != anahtar or not bekleyen_var(st.session_state.get(anahtar)):
+                    st.session_state.liste_taban = taban = (anahtar, edt.reset_index(drop=True))
+                st.data_editor(taban[1], key=anahtar, column_config={"ID": None, "Durum": st.column_config.CheckboxColumn(default=False), "Tutar": st.column_config.NumberColumn(format="%.0f"), "Kategori": st.column_config.SelectboxColumn(options=df_kat["Kategori"].unique().tolist()), "Tür": st.column_config.SelectboxColumn(options=["Gider", "Gelir"])}, hide_index=True, use_container_width=True, num_rows="dynamic")
+                if st.button("💾 Tabloyu Kaydet", use_container_width=True) and kuyrugu_bosalt(kuyruk):
+                    guncel, eklenen, silinen, tarihsiz = degisiklikleri_cikar(taban[1], st.session_state.get(anahtar))
+                    dokunulan = taban[1][taban[1]["ID"].isin(set(guncel["ID"]) | set(silinen))]
+                    # Başka bir sekme/oturum bu satırları tabandan sonra değiştirdiyse üzerine yazılmaz
+                    depo.surumu_kontrol_et(zorla=True)
+                    cakisan = farkli_satirlar(dokunulan, depo.read_rows(dokunulan["ID"])) if not dokunulan.empty else []
+                    if cakisan: st.error(f"{len(cakisan)} satır başka bir yerde değiştirilmiş, kaydedilmedi. 🔄 Yenile'ye basıp tekrar düzenleyin.")
+                    elif guncel.empty and eklenen.empty and not silinen: st.info("Değişiklik yok.")
+                    else:
+                        with olcum.asama("kayit:liste", satir=len(guncel) + len(eklenen) + len(silinen)): kaydedildi = degisiklikleri_kaydet(depo, guncel, eklenen, silinen)
+                        if kaydedildi:
+                            parcalar = [f"{n} {ad}" for n, ad in ((len(guncel), "satır güncellendi"), (len(eklenen), "eklendi"), (len(silinen), "silindi")) if n]
+                            if tarihsiz: parcalar.append(f"{tarihsiz} tarihsiz satır atlandı")
+                            st.session_state.liste_no += 1
+                            st.success(", ".join(parcalar) + "."); time.sleep(0.5); st.rerun()
         else: st.write("Kayıt yok.")
 
-    with t4:
+    with t4, olcum.asama("sekme:Ayar"):
         c1, c2 = st.columns(2)
         with c1:
             with st.form("ke"):
@@ -429,12 +452,41 @@ else:
                 ka = st.text_input("Ad", label_visibility="collapsed", placeholder="Yeni Kategori")
                 kg = st.number_input("Gün", 0, 31, 0, label_visibility="collapsed")
                 if st.form_submit_button("Ekle"):
-                    gk = conn.read(worksheet="Kategoriler", ttl=0) if not df_kat.empty else df_kat
+                    depo.surumu_kontrol_et(zorla=True); gk = kategorileri_cek(depo)
                     if ka and ka not in gk["Kategori"].values:
-                        kategorileri_kaydet(conn, pd.concat([gk, pd.DataFrame([{"Kategori": ka, "Tur": kt, "VarsayilanGun": kg}])], ignore_index=True)); st.success("Eklendi."); st.rerun()
+                        kategorileri_kaydet(depo, pd.concat([gk, pd.DataFrame([{"Kategori": ka, "Tur": kt, "VarsayilanGun": kg}])], ignore_index=True)); st.success("Eklendi."); st.rerun()
         with c2:
             if not df_kat.empty:
                 sk = st.selectbox("Sil", df_kat["Kategori"].tolist(), label_visibility="collapsed")
                 if st.button("Sil", type="primary", use_container_width=True):
-                    if sk in df["Kategori"].values: st.error("Kullanımda!")
-                    else: kategorileri_kaydet(conn, df_kat[df_kat["Kategori"]!=sk]); st.success("Silindi."); st.rerun()
+                    if (verileri_cek(depo)["Kategori"] == sk).any(): st.error("Kullanımda!")
+                    else: kategorileri_kaydet(depo, df_kat[df_kat["Kategori"]!=sk]); st.success("Silindi."); st.rerun()
+        with st.expander("🏦 Ekstre Aktar"):
+            dosya = st.file_uploader("Banka / kart ekstresi (CSV)", type=["csv"])
+            isaret = st.radio("İşaret", ["Eksi tutar gider (banka)", "Artı tutar gider (kart)"], horizontal=True, label_visibility="collapsed")
+            kural = st.text_area("Kurallar", placeholder="migros=Market\nmaaş=Maaş", help="Açıklamada anahtar geçen satırlar o kategoriye atanır; kategori adları ve #etiketleri zaten kuraldır")
+            if dosya is not None and st.button("Aktar", use_container_width=True) and kuyrugu_bosalt(kuyruk):
+                try:
+                    # Tekrar kontrolü için yalnızca ekstrenin kapsadığı yıllar okunur
+                    yeni, atlanan = ekstre_oku(dosya, df_kat, lambda yillar: birlestir(*[depo.read_ledger(y) for y in yillar]),
+                                               ek_kurallar=kurallari_coz(kural), isaret="eksi_gider" if isaret.startswith("Eksi") else "arti_gider")
+                    if not yeni.empty:
+                        with olcum.asama("kayit:ekstre", satir=len(yeni)): kaydedildi = satirlari_ekle(depo, yeni)
+                        if kaydedildi:
+                            kategorisiz = int(yeni["Kategori"].isna().sum())
+                            st.success(f"{len(yeni)} kayıt aktarıldı, {atlanan} tekrar atlandı." + (f" {kategorisiz} kaydın kategorisi boş, Liste'den atayın." if kategorisiz else "")); time.sleep(1); st.rerun()
+                    else: st.warning(f"Yeni kayıt yok ({atlanan} tekrar atlandı).")
+                except Exception as e: st.error(f"Hata: {e}")
+        st.caption(f"Önbellek: {depo.sayac['isabet']} isabet · {depo.sayac['iska']} ıska · {depo.sayac['surum_kontrol']} sürüm kontrolü · sürüm {depo.surum}")
+        br = depo.bellek_raporu
+        if br: st.caption(f"Defter belleği: {br['once'] / 1024:,.0f} KB → {br['sonra'] / 1024:,.0f} KB (tipli)")
+
+    # 6. ÖLÇÜM PANELİ
+    if olcum.acik:
+        with st.expander("⏱️ Ölçüm"):
+            st.caption(f"Bu çalıştırma · {olcum.kayit()['toplam_ms']:,.0f} ms")
+            st.dataframe(pd.DataFrame(olcum.asamalar), hide_index=True, use_container_width=True)
+            if onceki_olcum and onceki_olcum["asamalar"]:
+                st.caption(f"Önceki çalıştırma · {onceki_olcum['toplam_ms']:,.0f} ms")
+                st.dataframe(pd.DataFrame(onceki_olcum["asamalar"]), hide_index=True, use_container_width=True)
+        olcum.bitir()
@@ -0,0 +1,30 @@
+"""
+Google Sheets'teki defteri ve kategorileri tek seferde taşır.
+Bağlantı bilgileri uygulamayla aynı yerden (.streamlit/secrets.toml) okunur.
+
+Kullanım:
+    python tasi.py [butce.db]   # SQLite dosyasına
+    python tasi.py --yillik     # aynı tablodaki yıllık sayfalara (Veriler_2025, ...)
+Sonra secrets.toml içinde:
+    [depo]
+    tur = "sqlite"              # ya da "gsheets_yillik"
+    yol = "butce.db"
+"""
+import sys
+import streamlit as st
+from butce.depo import SheetsDepo, SqliteDepo, YillikSheetsDepo, depoyu_tasi
+
+def main(hedef="butce.db"):
+    from streamlit_gsheets import GSheetsConnection
+    conn = st.connection("gsheets", type=GSheetsConnection)
+    try:
+        if hedef == "--yillik":
+            satir, kategori = depoyu_tasi(SheetsDepo(conn), YillikSheetsDepo(conn))
+            print(f"{satir} kayıt yıllık sayfalara bölündü")
+            return
+        satir, kategori = depoyu_tasi(SheetsDepo(conn), SqliteDepo(hedef))
+    except ValueError as e: sys.exit(f"Taşıma yapılmadı: {e}")
+    print(f"{satir} kayıt, {kategori} kategori -> {hedef}")
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,64 @@
+import re
+import numpy as np
+import pandas as pd
+import pytest
+from butce import analiz
+from butce.analiz import etiketleri_analiz_et
+
+def eski_etiket_analizi(df):
+    # Vektörleştirme öncesi iterrows sürümü (karşılaştırma için referans)
+    etiket_verisi = []
+    for _, row in df.iterrows():
+        bulunanlar = re.findall(r"#(\w+)", str(row["Açıklama"]).lower())
+        if bulunanlar:
+            for etiket in bulunanlar: etiket_verisi.append({"Etiket": etiket, "Tutar": row["Tutar"] / len(bulunanlar)})
+    if etiket_verisi: return pd.DataFrame(etiket_verisi).groupby("Etiket")["Tutar"].sum().reset_index().sort_values("Tutar", ascending=False)
+    return pd.DataFrame()
+
+def karsilastir(yeni, eski):
+    pd.testing.assert_frame_equal(yeni.sort_values("Etiket").reset_index(drop=True), eski.sort_values("Etiket").reset_index(drop=True), check_exact=False)
+
+@pytest.fixture(autouse=True)
+def temiz_onbellek():
+    analiz._etiket_onbellegi.clear(); yield; analiz._etiket_onbellegi.clear()
+
+def sentetik_defter(n, tohum=7):
+    rng = np.random.default_rng(tohum)
+    kelime = np.array(["süt", "ekmek", "kira", "Fatura", "taksi"], dtype=object)
+    etiket = np.array(["#Tatil", "#ev", "#gıda", "#iş_yeri", "#çocuk", "#a1"], dtype=object)
+    aciklama = [k + "".join(" " + e for e in etiket[rng.integers(0, len(etiket), s)]) + f" {i % 997}"
+                for i, (k, s) in enumerate(zip(kelime[rng.integers(0, len(kelime), n)], rng.choice(4, n)))]
+    aciklama[::50] = [None] * len(aciklama[::50])
+    return pd.DataFrame({"Açıklama": aciklama, "Tutar": rng.lognormal(5, 1, n).round(2)})
+
+def test_buyuk_sentetik_cercevede_eski_surumle_ayni():
+    df = sentetik_defter(50_000)
+    eski = eski_etiket_analizi(df)
+    karsilastir(etiketleri_analiz_et(df), eski)
+    # Önbellekten gelen ikinci çalıştırma da aynı sonucu verir
+    karsilastir(etiketleri_analiz_et(df), eski)
+
+def test_etiketsiz_ve_bos_cerceve():
+    assert etiketleri_analiz_et(pd.DataFrame({"Açıklama": ["süt", None], "Tutar": [1.0, 2.0]})).empty
+    assert etiketleri_analiz_et(pd.DataFrame(columns=["Açıklama", "Tutar"])).empty
+
+def test_onbellek_siniri_asilinca_etiketler_kaybolmaz(monkeypatch):
+    monkeypatch.setattr(analiz, "ONBELLEK_SINIRI", 3)
+    ilk = pd.DataFrame({"Açıklama": ["a #x", "b #x #y", "c #x"], "Tutar": [10.0, 20.0, 0.0]})
+    etiketleri_analiz_et(ilk)
+    # Önceki metinler önbellekte; yeni metinler sınırı aşar ve önbellek boşaltılır
+    df = pd.concat([ilk, pd.DataFrame({"Açıklama": ["d #w", "e #z #w"], "Tutar": [1.0, 2.0]})], ignore_index=True)
+    sonuc = etiketleri_analiz_et(df)
+    karsilastir(sonuc, eski_etiket_analizi(df))
+    assert set(sonuc["Etiket"]) == {"x", "y", "w", "z"}
+
+def test_paralel_oturumlar_ve_bosaltma_etiket_kaybettirmez(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    monkeypatch.setattr(analiz, "ONBELLEK_SINIRI", 300)
+    defterler = [sentetik_defter(600, tohum=t) for t in range(8)]
+    beklenen = [eski_etiket_analizi(df) for df in defterler]
+    def calistir(i):
+        if i % 3 == 0: analiz._etiket_onbellegi.clear()
+        return etiketleri_analiz_et(defterler[i % 8])
+    with ThreadPoolExecutor(8) as havuz: sonuclar = list(havuz.map(calistir, range(32)))
+    for i, sonuc in enumerate(sonuclar): karsilastir(sonuc, beklenen[i % 8])
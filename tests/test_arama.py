@@ -0,0 +1,47 @@
+import pandas as pd
+from butce.arama import AramaIndeksi
+from butce.sema import normalize_et
+
+def defter():
+    return normalize_et(pd.DataFrame({
+        "Tarih": ["2024-03-05", "2024-03-20", "2024-04-01", "2024-04-15"],
+        "Kategori": ["Market", "Ulaşım", "Fatura", "Market"],
+        "Tür": "Gider", "Tutar": [120.5, 75.0, 500.0, 250.0], "Son Ödeme Tarihi": "",
+        "Açıklama": ["MIGROS #gıda", "araba yıkama #araba", "Elektrik #ev #fatura", "Şok #gıda #tatil"],
+        "Durum": False, "ID": ["r1", "r2", "r3", "r4"],
+    }))
+
+def bulunan(sorgu, df=None):
+    df = defter() if df is None else df
+    return df.loc[AramaIndeksi(df).ara(sorgu), "ID"].tolist()
+
+def test_duz_terim_diger_satirlardan_bagimsiz_kelime_icinde_arar():
+    # "araba yıkama" kelime başında "ar" tutuyor; Market'in içindeki "ar" yine bulunmalı
+    assert bulunan("ar") == ["r1", "r2", "r4"]
+    assert bulunan("ark") == ["r1", "r4"]
+
+def test_duz_terim_turkce_harf_ve_tarih_tutar():
+    assert bulunan("mıgros") == ["r1"]
+    assert bulunan("2024-04") == ["r3", "r4"]
+    assert bulunan("120.5") == ["r1"]
+
+def test_etiket_ve_kategori_onekleri():
+    assert bulunan("#gı") == ["r1", "r4"]
+    assert bulunan("#ar") == ["r2"]
+    assert bulunan("kategori:mar") == ["r1", "r4"]
+    assert bulunan("kat:fat") == ["r3"]
+    # Öneklidir: kelime ortası eşleşmez
+    assert bulunan("#ıda") == [] and bulunan("kat:ket") == []
+
+def test_tutar_islecleri():
+    assert bulunan("tutar>250") == ["r3"]
+    assert bulunan("tutar>=250") == ["r3", "r4"]
+    assert bulunan("tutar<100") == ["r2"]
+    assert bulunan("tutar<=120,5") == ["r1", "r2"]
+    assert bulunan("tutar:100-250") == ["r1", "r4"]
+    assert bulunan("tutar:75") == ["r2"]
+
+def test_terimler_ve_ile_baglanir():
+    assert bulunan("#gıda tutar>200") == ["r4"]
+    assert bulunan("market #tatil") == ["r4"]
+    assert bulunan("market yok") == []
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bench import BellekBaglantisi
+from butce.depo import SheetsDepo, SqliteDepo, YillikSheetsDepo, depoyu_tasi
+from butce.onbellek import OnbellekliDepo
+from butce.sema import KOLONLAR
+
+def sayfa(*tarihler):
+    return pd.DataFrame({"Tarih": list(tarihler), "Kategori": "Market", "Tür": "Gider", "Tutar": 10.0,
+                         "Son Ödeme Tarihi": "", "Açıklama": "x", "Durum": False, "ID": [f"r{i}" for i in range(len(tarihler))]})[KOLONLAR]
+
+def baglanti(veriler):
+    return BellekBaglantisi({"Veriler": veriler, "Kategoriler": pd.DataFrame({"Kategori": ["Market"], "Tur": ["Gider"], "VarsayilanGun": [0]}),
+                             "Meta": pd.DataFrame({"Surum": ["v1"]})})
+
+def test_sqlite_goc_tum_satirlari_tasir():
+    hedef = SqliteDepo(":memory:")
+    assert depoyu_tasi(SheetsDepo(baglanti(sayfa("2024-03-05", "2025-01-02"))), hedef) == (2, 1)
+    assert sorted(hedef.read_ledger()["ID"]) == ["r0", "r1"]
+
+@pytest.mark.parametrize("hedef", [lambda c: SqliteDepo(":memory:"), YillikSheetsDepo])
+def test_tarihsiz_satir_varsa_goc_durur(hedef):
+    conn = baglanti(sayfa("2024-03-05", "", "2024-13-45"))
+    h = hedef(conn)
+    with pytest.raises(ValueError, match=r"2 satırın tarihi.*sayfa satırı: 3, 4"): depoyu_tasi(SheetsDepo(conn), h)
+    # Hiçbir şey yazılmadı
+    assert h.read_ledger().empty and "Veriler_2024" not in conn.sayfalar
+
+def test_yillik_rewrite_tarihsiz_satiri_dusurmez():
+    with pytest.raises(ValueError): YillikSheetsDepo(baglanti(sayfa())).rewrite(sayfa("2024-03-05", None))
+
+class KotaliBaglanti(BellekBaglantisi):
+    """Meta okumalarını sayar; hata verildiyse Meta okuması bir kez onunla düşer."""
+    def __init__(self, sayfalar=None):
+        super().__init__(sayfalar); self.meta_okuma = 0; self.hata = None
+
+    def read(self, worksheet, ttl=0):
+        if worksheet == "Meta":
+            self.meta_okuma += 1
+            if self.hata: hata, self.hata = self.hata, None; raise hata
+        return super().read(worksheet, ttl)
+
+def test_surum_yalnizca_meta_sayfasi_yoksa_sifir():
+    conn = KotaliBaglanti({"Veriler": sayfa("2024-03-05")})
+    assert SheetsDepo(conn).read_version() == "0"
+    conn.sayfalar["Meta"] = pd.DataFrame({"Surum": ["v1"]})
+    conn.hata = RuntimeError("APIError: [429]: Quota exceeded")
+    with pytest.raises(RuntimeError): SheetsDepo(conn).read_version()
+    assert SheetsDepo(conn).read_version() == "v1"
+
+def test_onbellek_gecici_hatada_bilinen_surumu_korur():
+    conn = KotaliBaglanti({"Veriler": sayfa("2024-03-05"), "Meta": pd.DataFrame({"Surum": ["v1"]})})
+    depo = OnbellekliDepo(SheetsDepo(conn), kontrol_araligi=0)
+    assert depo.surumu_kontrol_et() == "v1" and len(depo.read_ledger()) == 1
+    conn.hata = RuntimeError("APIError: [429]: Quota exceeded")
+    # Sürüm "0"a düşmez, önbellek boşaltılmaz
+    assert depo.surumu_kontrol_et() == "v1" and depo.sayac["iska"] == 1
+    depo.read_ledger(); assert depo.sayac["iska"] == 1
+
+def test_yazma_tek_surum_okumasi_yapar():
+    conn = KotaliBaglanti({"Veriler": sayfa("2024-03-05"), "Meta": pd.DataFrame({"Surum": ["v1"]})})
+    depo = OnbellekliDepo(SheetsDepo(conn), kontrol_araligi=60)
+    depo.read_ledger(); once = conn.meta_okuma
+    depo.append_rows(sayfa("2024-04-01").assign(ID=pd.NA))
+    assert conn.meta_okuma - once == 1
+    assert len(depo.read_ledger()) == 2 and conn.meta_okuma - once == 1
+
+class Sayfa:
+    """gspread Worksheet'in depoda kullanılan kısmı; hücreler başlıklı metin ızgarasıdır."""
+    def __init__(self, df): self.izgara = [list(df.columns)] + df.astype(object).fillna("").astype(str).values.tolist()
+
+    def _genislet(self, r, c):
+        while len(self.izgara) < r: self.izgara.append([])
+        for satir in self.izgara: satir.extend([""] * (c - len(satir)))
+
+    def row_values(self, r): return list(self.izgara[r - 1]) if r <= len(self.izgara) else []
+    def col_values(self, c): return [s[c - 1] if c <= len(s) else "" for s in self.izgara]
+
+    def batch_update(self, istekler, value_input_option=None):
+        from gspread.utils import a1_range_to_grid_range
+        for istek in istekler:
+            aralik = a1_range_to_grid_range(istek["range"])
+            r0, c0 = aralik["startRowIndex"], aralik["startColumnIndex"]
+            for i, satir in enumerate(istek["values"]):
+                self._genislet(r0 + i + 1, c0 + len(satir))
+                self.izgara[r0 + i][c0:c0 + len(satir)] = [str(v) for v in satir]
+
+    def append_rows(self, satirlar, value_input_option=None, table_range=None):
+        self.izgara += [[str(v) for v in s] for s in satirlar]; self._genislet(len(self.izgara), len(self.izgara[0]))
+
+    def delete_rows(self, bas, son): del self.izgara[bas - 1:son]
+
+class SayfaBaglantisi:
+    """Satır bazlı erişimi olan bağlantı: conn.client._select_worksheet tek bir Sayfa döner."""
+    def __init__(self, df): self.ws = Sayfa(df); self.client = self
+
+    def _select_worksheet(self, worksheet): return self.ws
+
+    def read(self, worksheet, ttl=0):
+        baslik, *satirlar = self.ws.izgara
+        return pd.DataFrame(satirlar, columns=baslik).replace("", np.nan)
+
+    def update(self, worksheet, data): self.ws = Sayfa(data)
+
+def karisik_sayfa():
+    # Kolonlar şema sırasında değil, araya şemada olmayan bir "Not" sütunu girmiş
+    df = sayfa("2024-03-05", "2024-03-06", "2024-03-07").assign(Not=["a", "b", "c"])
+    return df[["ID", "Not", "Açıklama", "Tarih", "Tutar", "Tür", "Kategori", "Durum", "Son Ödeme Tarihi"]]
+
+def test_guncelleme_basliktaki_sutun_sirasina_yazar():
+    conn = SayfaBaglantisi(karisik_sayfa()); depo = SheetsDepo(conn)
+    df = depo.read_ledger()
+    assert depo.update_rows(df[df["ID"] == "r1"].assign(Tutar=99.0, Açıklama="yeni")) == 1
+    sonra = conn.read("Veriler")
+    assert sonra["Not"].tolist() == ["a", "b", "c"] and sonra["ID"].tolist() == ["r0", "r1", "r2"]
+    assert sonra.loc[1, "Açıklama"] == "yeni" and float(sonra.loc[1, "Tutar"]) == 99.0 and sonra.loc[1, "Tarih"] == "2024-03-06"
+
+def test_silme_ve_ekleme_basliktaki_id_sutununu_kullanir():
+    conn = SayfaBaglantisi(karisik_sayfa()); depo = SheetsDepo(conn)
+    assert depo.delete_rows(["r1"]) == 1
+    assert conn.read("Veriler")["ID"].tolist() == ["r0", "r2"]
+    depo.append_rows(sayfa("2024-04-01").assign(ID="r9"))
+    son = conn.read("Veriler").iloc[-1]
+    assert son["ID"] == "r9" and son["Tarih"] == "2024-04-01" and pd.isna(son["Not"])
+    assert depo.read_ledger()["ID"].tolist() == ["r0", "r2", "r9"]
+
+def test_bos_idler_basliktaki_id_sutununa_yazilir():
+    df = karisik_sayfa(); df.loc[1, "ID"] = ""
+    conn = SayfaBaglantisi(df)
+    yeni = SheetsDepo(conn).read_ledger()["ID"].iloc[1]
+    assert yeni.startswith("r") and conn.read("Veriler")["ID"].tolist() == ["r0", yeni, "r2"]
+    assert conn.read("Veriler")["Not"].tolist() == ["a", "b", "c"]
+
+def test_satir_erisimi_yokken_guncelleme():
+    conn = BellekBaglantisi({"Veriler": sayfa("2024-03-05", "2024-03-06")})
+    depo = SheetsDepo(conn)
+    df = depo.read_ledger()
+    assert depo.update_rows(df[df["ID"] == "r1"].assign(Tutar=42.0, Durum=True)) == 1
+    assert depo.read_ledger().set_index("ID").loc["r1", ["Tutar", "Durum"]].tolist() == [42.0, True]
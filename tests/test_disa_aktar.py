@@ -0,0 +1,41 @@
+import io
+import pandas as pd
+import pytest
+from butce.disa_aktar import aralik_filtrele, disa_aktar
+from butce.sema import KOLONLAR, normalize_et
+
+def defter(n=7):
+    return normalize_et(pd.DataFrame({
+        "Tarih": pd.date_range("2024-03-01", periods=n).strftime("%Y-%m-%d"), "Kategori": "Market", "Tür": "Gider",
+        "Tutar": [10.5 * (i + 1) for i in range(n)], "Son Ödeme Tarihi": "", "Açıklama": [f"alışveriş {i}" for i in range(n)],
+        "Durum": [i % 2 == 0 for i in range(n)], "ID": [f"r{i}" for i in range(n)],
+    }))
+
+def test_csv_parcali_yazilir_ve_geri_okunur():
+    df = defter()
+    cikti = disa_aktar(df, "CSV", parca=3)
+    # Kopya çıkarılmadan başa sarılmış tampon döner
+    assert isinstance(cikti, io.BytesIO) and cikti.tell() == 0
+    geri = normalize_et(pd.read_csv(cikti))
+    assert list(geri.columns) == KOLONLAR and len(geri) == len(df)
+    pd.testing.assert_series_equal(geri["Tutar"], df["Tutar"])
+    assert geri["ID"].tolist() == df["ID"].tolist() and geri["Durum"].tolist() == df["Durum"].tolist()
+
+def test_bos_defter_yalnizca_baslik():
+    assert pd.read_csv(disa_aktar(defter().head(0), "CSV")).columns.tolist() == KOLONLAR
+
+@pytest.mark.parametrize("bicim, modul", [("Excel", "openpyxl"), ("Parquet", "pyarrow")])
+def test_ikili_bicimler(bicim, modul):
+    pytest.importorskip(modul)
+    df = defter()
+    cikti = disa_aktar(df, bicim, parca=3)
+    geri = pd.read_excel(cikti) if bicim == "Excel" else pd.read_parquet(cikti)
+    assert len(geri) == len(df) and geri["ID"].tolist() == df["ID"].tolist()
+    assert geri["Tutar"].tolist() == df["Tutar"].tolist()
+
+def test_aralik_iki_ucu_dahil():
+    assert aralik_filtrele(defter(), "2024-03-02", "2024-03-04")["ID"].tolist() == ["r1", "r2", "r3"]
+    assert len(aralik_filtrele(defter(), bit="2024-03-02")) == 2
+
+def test_bilinmeyen_bicim():
+    with pytest.raises(ValueError): disa_aktar(defter(), "PDF")
@@ -0,0 +1,51 @@
+import io
+import pandas as pd
+from butce.ice_aktar import ekstre_oku, tarih_cevir, tekrarlari_ayikla, tutar_cevir
+from butce.sema import bos_defter
+
+KATEGORILER = pd.DataFrame([{"Kategori": "Market", "Tur": "Gider", "VarsayilanGun": 0}, {"Kategori": "Maaş", "Tur": "Gelir", "VarsayilanGun": 1}])
+
+def csv(metin): return io.BytesIO(metin.encode("utf-8"))
+
+def test_iso_tarihler_gun_ay_karistirilmadan_okunur():
+    tarih = tarih_cevir(pd.Series(["2024-03-05", "2024-03-20", "2024-03-05 10:30:00"]))
+    assert tarih.tolist() == [pd.Timestamp("2024-03-05"), pd.Timestamp("2024-03-20"), pd.Timestamp("2024-03-05")]
+
+def test_gun_once_tarihler_ve_karisik_sutun():
+    tarih = tarih_cevir(pd.Series(["05.03.2024", "20.03.2024", "05/03/2024", "2024-03-20", "31.02.2024", None]))
+    assert tarih.iloc[:4].tolist() == [pd.Timestamp("2024-03-05"), pd.Timestamp("2024-03-20"), pd.Timestamp("2024-03-05"), pd.Timestamp("2024-03-20")]
+    assert tarih.iloc[4:].isna().all()
+
+def test_turkce_ve_noktali_tutarlar():
+    tutar = tutar_cevir(pd.Series(["1.234,56", "-45,90 TL", "1234.56", "+12", "₺ 1.000.000,00", "", "abc"]))
+    assert tutar.iloc[:5].tolist() == [1234.56, -45.9, 1234.56, 12.0, 1000000.0]
+    assert tutar.iloc[5:].isna().all()
+
+def test_tekrar_sayisi_kurali():
+    def satirlar(*tutarlar): return pd.DataFrame({"Tarih": pd.Timestamp("2024-03-05"), "Tutar": list(tutarlar), "Açıklama": "Kahve"})
+    # Defterde 2 kahve var: ekstredeki ilk 2 kahve atlanır, 3. eklenir; farklı tutar hep eklenir
+    yeni = tekrarlari_ayikla(satirlar(50.0, 50.0, 50.0, 60.0), satirlar(50.0, 50.0))
+    assert yeni["Tutar"].tolist() == [50.0, 60.0]
+    # Açıklamanın büyük/küçük harfi ve boşlukları özeti değiştirmez
+    assert tekrarlari_ayikla(satirlar(50.0).assign(Açıklama="  KAHVE "), satirlar(50.0)).empty
+    assert len(tekrarlari_ayikla(satirlar(50.0, 50.0), satirlar().head(0))) == 2
+
+def test_ingilizce_iso_ekstre():
+    yeni, atlanan = ekstre_oku(csv("Date,Amount,Description\n2024-03-05,-120.50,MIGROS\n2024-03-20,-10,Unknown shop\n"), KATEGORILER, lambda yillar: bos_defter())
+    assert atlanan == 0
+    assert yeni["Tarih"].tolist() == [pd.Timestamp("2024-03-05"), pd.Timestamp("2024-03-20")]
+    assert yeni["Tutar"].tolist() == [120.5, 10.0] and (yeni["Tür"] == "Gider").all()
+
+def test_kategori_kurallari_ve_eslesmeyenler_bos_kalir():
+    yeni, _ = ekstre_oku(csv("Tarih;Açıklama;Tutar\n05.03.2024;MIGROS KADIKOY;-1.234,50\n06.03.2024;Maaş ödemesi;25.000,00\n07.03.2024;HAVALE;-5,00\n"),
+                         KATEGORILER, lambda yillar: bos_defter(), ek_kurallar={"migros": "Market"})
+    assert yeni["Kategori"].iloc[:2].tolist() == ["Market", "Maaş"]
+    assert pd.isna(yeni["Kategori"].iloc[2])
+    # Maaş'ın varsayılan günü 1: son ödeme sonraki ayın 1'i
+    assert yeni["Son Ödeme Tarihi"].iloc[1] == pd.Timestamp("2024-04-01")
+
+def test_ayni_ekstre_ikinci_kez_eklenmez():
+    metin = "Tarih;Açıklama;Tutar\n05.03.2024;Kahve;-50,00\n05.03.2024;Kahve;-50,00\n"
+    ilk, _ = ekstre_oku(csv(metin), KATEGORILER, lambda yillar: bos_defter())
+    ikinci, atlanan = ekstre_oku(csv(metin), KATEGORILER, lambda yillar: ilk)
+    assert len(ilk) == 2 and ikinci.empty and atlanan == 2
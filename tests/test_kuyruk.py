@@ -0,0 +1,60 @@
+import pandas as pd
+from butce.depo import SqliteDepo
+from butce.kuyruk import YazmaKuyrugu
+from butce.onbellek import OnbellekliDepo
+
+class KotaHatasi(Exception):
+    def __init__(self): super().__init__("APIError: [429]: Quota exceeded")
+
+class HataliDepo(SqliteDepo):
+    """İstenen işlemde bir kez kota hatası veren bellek içi SQLite deposu; 'sonra' ise veri yazıldıktan sonra."""
+    def __init__(self, islem, sonra=False):
+        super().__init__(":memory:")
+        self.islem, self.sonra, self.kalan = islem, sonra, 1
+
+    def _belki_hata(self, ad):
+        if ad == self.islem and self.kalan: self.kalan -= 1; raise KotaHatasi()
+
+    def append_rows(self, df):
+        if not self.sonra: self._belki_hata("append_rows")
+        sonuc = super().append_rows(df)
+        if self.sonra: self._belki_hata("append_rows")
+        return sonuc
+
+    def write_version(self, surum):
+        self._belki_hata("write_version")
+        return super().write_version(surum)
+
+def satirlar(n):
+    return pd.DataFrame({"Tarih": pd.Timestamp("2026-03-05"), "Kategori": "Market", "Tür": "Gider", "Tutar": [float(i + 1) for i in range(n)], "Açıklama": "", "Durum": False})
+
+def kuyruk_kur(depo):
+    uykular = []
+    return YazmaKuyrugu(OnbellekliDepo(depo), bekleme=60, uyku=uykular.append), uykular
+
+def yazilan_idler(depo): return depo.read_ledger()["ID"].tolist()
+
+def test_surum_yazma_kota_hatasi_satirlari_cogaltmaz():
+    depo = HataliDepo("write_version")
+    kuyruk, uykular = kuyruk_kur(depo)
+    kuyruk.ekle(satirlar(3))
+    assert kuyruk.bosalt() == 3
+    idler = yazilan_idler(depo)
+    assert len(idler) == 3 and len(set(idler)) == 3
+    assert kuyruk.bekleyen == 0 and uykular == []
+
+def test_yazdiktan_sonra_gelen_hata_tekrar_gondermez():
+    depo = HataliDepo("append_rows", sonra=True)
+    kuyruk, uykular = kuyruk_kur(depo)
+    kuyruk.ekle(satirlar(2)); kuyruk.ekle(satirlar(1))
+    assert kuyruk.bosalt() == 3
+    idler = yazilan_idler(depo)
+    assert len(idler) == 3 and len(set(idler)) == 3
+    assert uykular == [1.0]
+
+def test_yazmadan_once_gelen_hata_yeniden_denenir():
+    depo = HataliDepo("append_rows")
+    kuyruk, uykular = kuyruk_kur(depo)
+    kuyruk.ekle(satirlar(2))
+    assert kuyruk.bosalt() == 2
+    assert len(yazilan_idler(depo)) == 2 and uykular == [1.0] and kuyruk.hata is None